@@ -2,8 +2,9 @@
 
 from pydantic import BaseModel, Field, ConfigDict, model_validator
 from enum import Enum
+from functools import lru_cache
 from urllib.parse import urlparse, unquote
-from typing import Any, Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List
 from datetime import datetime
 
 BUBBLE_METADATA_FIELDS = {"_id", "Created Date", "Modified Date", "Created By"}
@@ -46,6 +47,45 @@ def parse_enum(enum_class, value, default=None):
         pass
     return default
 
+def _make_enum_table(enum_class) -> Dict[Any, Enum]:
+    """
+    Map each member, value, name and label to its member. setdefault keeps the
+    first member that claims a key, matching parse_enum's member-order
+    precedence.
+    """
+    table: Dict[Any, Enum] = {}
+    for member in enum_class:
+        table.setdefault(member, member)
+        table.setdefault(member.value, member)
+        table.setdefault(member.name, member)
+        label = getattr(member, 'label', None)
+        if label is not None:
+            table.setdefault(label, member)
+    return table
+
+# One parser per enum class; the set of classes is fixed
+@lru_cache(maxsize=None)
+def enum_lookup(enum_class) -> Callable[[Any], Optional[Enum]]:
+    """
+    Return a cached parser that behaves like parse_enum(enum_class, v).
+    Members, values, names and labels resolve with one dict hit; anything
+    else (misses, int positions, unhashable payload values) goes through
+    parse_enum itself.
+    """
+    table = _make_enum_table(enum_class)
+
+    def parse(value):
+        try:
+            member = table.get(value)
+        except TypeError:
+            # Unhashable, e.g. a dict or list in a Bubble payload
+            member = None
+        if member is None:
+            return parse_enum(enum_class, value)
+        return member
+
+    return parse
+
 def enum_to_bubble_value(value: Enum, field_name: str) -> Any:
     """
     Convert an Enum to its Bubble-API representation. By default, return the
@@ -103,30 +143,47 @@ class BubbleEnum(Enum):
                 return member
         return None
 
+# {alias: field name}, built once per model class; callers only read it
+@lru_cache(maxsize=None)
+def _alias_map(model_class) -> Dict[str, str]:
+    return {
+        field.alias: key
+        for key, field in model_class.model_fields.items()
+        if getattr(field, 'alias', None)
+    }
+
 def model_to_bubble(
     model: BaseModel,
     upload_file_url: Optional[str] = None,
     file_fields: Optional[List[str]] = None,
-    enum_overrides: Optional[Dict[str, str]] = None
+    enum_overrides: Optional[Dict[str, str]] = None,
+    exclude: Optional[set] = None,
 ) -> dict:
     file_fields = file_fields or []
     enum_overrides = enum_overrides or {}
 
     # ✅ USE by_alias=True
-    # Build both filtered and unfiltered dumps so we can re-insert any non-None fields
-    full_data = model.model_dump(by_alias=True, exclude_none=False)
-    raw_data = model.model_dump(by_alias=True, exclude_none=True)
-    # Debug: log keys in full vs filtered dumps
+    # Excluded fields are never serialized, rather than dumped and popped later
+    raw_data = model.model_dump(by_alias=True, exclude_none=True, exclude=exclude)
+    # exclude_none drops fields whose value is None, even when their serializer
+    # emits something. Re-dump just those fields, not the whole model, so any
+    # populated output can be re-inserted.
+    none_fields = {
+        name for name in type(model).model_fields
+        if getattr(model, name, None) is None
+    }
+    # Debug: log keys in the filtered dump and the fields it dropped
     try:
         from logging_config import logger as _logger
-        _logger.debug(f"🗃️ full_data keys in model_to_bubble: {list(full_data.keys())}")
         _logger.debug(f"🗃️ raw_data keys in model_to_bubble: {list(raw_data.keys())}")
+        _logger.debug(f"🗃️ None fields in model_to_bubble: {sorted(none_fields)}")
     except ImportError:
         pass
-    # Re-insert any populated fields that were dropped by exclude_none
-    for k, v in full_data.items():
-        if k not in raw_data and v is not None:
-            raw_data[k] = v
+    if none_fields:
+        none_data = model.model_dump(by_alias=True, include=none_fields, exclude=exclude)
+        for k, v in none_data.items():
+            if k not in raw_data and v is not None:
+                raw_data[k] = v
 
     cleaned = {k: v for k, v in raw_data.items() if k not in BUBBLE_METADATA_FIELDS}
 
@@ -165,10 +222,7 @@ def model_to_bubble(
         cleaned["upload_file"] = extract_filename_from_url(upload_file_url)
 
     # 🔧 Ensure all keys use alias names in case anything was added in snake_case
-    alias_map = {}
-    for key, field in model.model_fields.items():
-        if hasattr(field, 'alias') and field.alias:
-            alias_map[field.alias] = key
+    alias_map = _alias_map(type(model))
 
     cleaned = {alias_map.get(k, k): v for k, v in cleaned.items()}
 
@@ -200,7 +254,9 @@ class BubbleBaseModel(BaseModel):
                 data[k] = enum_to_bubble_value(v, k)
         return data
 
-    def to_bubble_dict(self, upload_file_url: Optional[str] = None) -> dict:
+    def to_bubble_dict(
+        self, upload_file_url: Optional[str] = None, exclude: Optional[set] = None
+    ) -> dict:
         file_fields = getattr(self.__class__, 'Meta', None)
         file_fields = getattr(file_fields, 'file_fields', [])
         enum_overrides = getattr(self.__class__, 'Meta', None)
@@ -211,6 +267,7 @@ class BubbleBaseModel(BaseModel):
             upload_file_url=upload_file_url,
             file_fields=file_fields,
             enum_overrides=enum_overrides,
+            exclude=exclude,
         )
         # Remove any empty values so we don't send blanks that overwrite existing data
         return strip_empty_fields(data)
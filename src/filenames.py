@@ -0,0 +1,33 @@
+# src/filenames.py
+
+import re
+import uuid
+from urllib.parse import unquote, urlparse
+
+
+# \w is str.isalnum() plus "_", so this drops all but alnum, space and dash
+_SANITIZE_STRIP_RE = re.compile(r"[^\w \-]|_")
+_SANITIZE_TRANS = str.maketrans({' ': '_', '-': '_'})
+
+def sanitize_data(data: str):
+    """Sanitize project name by removing special characters."""
+    return _SANITIZE_STRIP_RE.sub('', data).translate(_SANITIZE_TRANS)
+
+def extract_filename_from_url(url: str) -> str:
+    """Extract the filename from a URL with proper handling of URL encoding."""
+    # Parse the URL
+    parsed_url = urlparse(url)
+
+    # Get the path component and extract the last part as the filename
+    # URL paths are always "/"-separated, whatever the host OS
+    path = parsed_url.path
+    filename = unquote(path).rsplit("/", 1)[-1]
+
+    # If filename is empty, generate a unique name
+    if not filename:
+        filename = f"file_{uuid.uuid4().hex[:8]}.stl"
+
+    # Ensure filename is sanitized
+    filename = sanitize_data(filename)
+
+    return filename
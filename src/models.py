@@ -5,13 +5,25 @@ from pydantic import (BaseModel, ConfigDict, Field, field_validator,
                       model_validator)
 
 #from .bubble_base import BubbleBaseModel, parse_enum
-from bubble_base import BubbleBaseModel, parse_enum
+from bubble_base import BubbleBaseModel, enum_lookup, parse_enum
+from filenames import extract_filename_from_url
 #from .enums import (AOIGeoType, AppType, BackfillDelayRule, BackfillMaterial,
 from enums import (AOIGeoType, AppType, BackfillDelayRule, BackfillMaterial,
                     BackfillType, DensificationLevel, DomainType,
                     FaultDirection, FLACVersion, InsituStressOption,
                     InsituStressType, ProjectType, RelGeoAccuracy)
 
+# Enum parsers for the hot before-validators, built once at import
+_parse_densification_level = enum_lookup(DensificationLevel)
+_parse_flac_version = enum_lookup(FLACVersion)
+_parse_stress_option = enum_lookup(InsituStressOption)
+_parse_rel_geo_accuracy = enum_lookup(RelGeoAccuracy)
+_SLOPEX_ENUM_FIELDS = {
+    "aoi_geo_type": enum_lookup(AOIGeoType),
+    "densification_intensity": _parse_densification_level,
+    "pit_densification_intensity": _parse_densification_level,
+}
+
 #
 # --- RocBox Utility ---
 #
@@ -135,15 +147,10 @@ class SlopeXModelConstruction(BubbleBaseModel):
             values["pit_densification_intensity"] = values["densification_intensity"]
 
         # Enum conversion
-        enum_fields = {
-            "aoi_geo_type": AOIGeoType,
-            "densification_intensity": DensificationLevel,
-            "pit_densification_intensity": DensificationLevel,
-        }
-        for field_name, enum_cls in enum_fields.items():
+        for field_name, parse in _SLOPEX_ENUM_FIELDS.items():
             if field_name in values:
                 try:
-                    values[field_name] = parse_enum(enum_cls, values[field_name])
+                    values[field_name] = parse(values[field_name])
                 except Exception:
                     # Let Pydantic handle invalid enum values with its own validation later
                     pass
@@ -159,8 +166,6 @@ class SlopeXModelConstruction(BubbleBaseModel):
         mode="before",
     )
     def strip_files(cls, v):
-        from utils import extract_filename_from_url
-
         return extract_filename_from_url(v)
 
 
@@ -221,8 +226,6 @@ class SettingModel(BubbleBaseModel):
 
     @field_validator("import_map3D_file", "import_mesh_file", mode="before")
     def validate_file_fields(cls, v):
-        from utils import extract_filename_from_url
-
         return extract_filename_from_url(v)
 
     @field_validator("import_mesh", mode="before")
@@ -234,13 +237,10 @@ class SettingModel(BubbleBaseModel):
     @field_validator("FLAC_version", mode="before")
     def parse_flac_version(cls, v):
         # Allow human-readable labels (e.g. "7.0") to map to FLACVersion
-        from bubble_base import parse_enum
-
-        if v is None or isinstance(v, FLACVersion):
+        if v is None:
             return v
-        # parse_enum returns an enum or None
-        parsed = parse_enum(FLACVersion, v)
-        return parsed or v
+        # parse_enum semantics: an enum member or None
+        return _parse_flac_version(v) or v
 
 
 class ModelConstructionModel(BubbleBaseModel):
@@ -302,16 +302,11 @@ class ModelConstructionDetail(BubbleBaseModel):
         """
         Normalize various representations (int code, enum, or string) to RelGeoAccuracy.
         """
-        from bubble_base import parse_enum
-
-        # Use parse_enum to handle int codes (mapping by order), enum names, values, and labels
-        parsed = parse_enum(RelGeoAccuracy, v)
-        return parsed
+        # Handles int codes (mapping by order), enum names, values, and labels
+        return _parse_rel_geo_accuracy(v)
 
     @field_validator("file", mode="before")
     def strip_file_urls(cls, v):
-        from utils import extract_filename_from_url
-
         return extract_filename_from_url(v)
 
 
@@ -372,8 +367,6 @@ class BackfillModel(BubbleBaseModel):
     @field_validator("backfill_file", mode="before")
     @classmethod
     def strip_file_urls(cls, v):
-        from utils import extract_filename_from_url
-
         if isinstance(v, dict):
             v = v.get("url") or v.get("id") or ""
 
@@ -509,8 +502,6 @@ class FaultModel(BubbleBaseModel):
 
     @field_validator("fault_surfacefile", "fault_file", mode="before")
     def strip_file_urls(cls, v):
-        from utils import extract_filename_from_url
-
         return extract_filename_from_url(v)
 
 
@@ -659,8 +650,6 @@ class DomainModel(BubbleBaseModel):
 
     @field_validator("domain_file", "domain_surface_file", mode="before")
     def strip_file_urls(cls, v):
-        from utils import extract_filename_from_url
-
         return extract_filename_from_url(v)
 
 
@@ -687,11 +676,9 @@ class InsituStressModel(BubbleBaseModel):
     @field_validator("stress_option", mode="before")
     def parse_stress_option(cls, v):
         # Allow human-readable or db_value strings to map to InsituStressOption
-        from bubble_base import parse_enum
-
         if v is None:
             return None
-        parsed = parse_enum(InsituStressOption, v)
+        parsed = _parse_stress_option(v)
         if parsed is None:
             raise ValueError(f"Invalid enum value '{v}' for InsituStressOption")
         return parsed
@@ -792,8 +779,6 @@ class ProjectModel(BubbleBaseModel):
 
     @field_validator("fault_global_file", "upload_file", "input_file", mode="before")
     def strip_file_urls(cls, v):
-        from utils import extract_filename_from_url
-
         return extract_filename_from_url(v)
 
     @field_validator("include_backfills", mode="before")
@@ -808,6 +793,15 @@ class ProjectModel(BubbleBaseModel):
 #
 # --- Composite Classes ---
 #
+def _with_excluded(exclude, field_name: str):
+    """Add field_name to a model_dump exclude argument (None, set or dict)."""
+    if exclude is None:
+        return {field_name}
+    if isinstance(exclude, dict):
+        return {**exclude, field_name: True}
+    return set(exclude) | {field_name}
+
+
 class Stopex(BubbleBaseModel):
     """
     Aggregates: Project, Setting, Model Construction, Model Construction Detail,
@@ -830,36 +824,38 @@ class Stopex(BubbleBaseModel):
 
     def model_dump(self, *args, **kwargs):
         """Override model_dump to handle None for model_construction in SlopeX projects"""
-        data = super().model_dump(*args, **kwargs)
         # For SlopeX projects, we'll still include model_construction as None
-        # but remove model_construction_details if it's empty
+        # but exclude model_construction_details up front if it's empty
         if not self.model_construction and not self.model_construction_details:
-            data.pop("model_construction_details", None)
-        return data
+            kwargs["exclude"] = _with_excluded(
+                kwargs.get("exclude"), "model_construction_details"
+            )
+        return super().model_dump(*args, **kwargs)
 
-    def to_bubble_dict(self, upload_file_url: Optional[str] = None) -> dict:
+    def to_bubble_dict(
+        self, upload_file_url: Optional[str] = None, exclude: Optional[set] = None
+    ) -> dict:
         """
         Custom to_bubble_dict implementation to handle None model_construction.
         """
         from logging_config import logger
 
-        # First get the standard dictionary
-        data = super().to_bubble_dict(upload_file_url)
-
-        # For SlopeX projects, remove model_construction fields if None
+        exclude = set(exclude or ())
+        # For SlopeX projects, skip model_construction fields if None
         if not self.model_construction:
             logger.info(
-                "ℹ️ Removing model_construction key from bubble data since it's None"
+                "ℹ️ Excluding model_construction key from bubble data since it's None"
             )
-            data.pop("model_construction", None)
+            exclude.add("model_construction")
 
         if not self.model_construction_details:
-            logger.info("ℹ️ Removing empty model_construction_details from bubble data")
-            data.pop("model_construction_details", None)
+            logger.info("ℹ️ Excluding empty model_construction_details from bubble data")
+            exclude.add("model_construction_details")
 
-        return data
+        return super().to_bubble_dict(upload_file_url, exclude=exclude or None)
 
-    model_config = ConfigDict(populate_by_name=True)
+    # Composite: build validator/serializer on first use, not at import
+    model_config = ConfigDict(populate_by_name=True, defer_build=True)
 
 
 class Slopex(BubbleBaseModel):
@@ -879,4 +875,5 @@ class Slopex(BubbleBaseModel):
     stress_details: List[InsituStressDetailModel]
     solving_parameter: Optional[SolvingParameterModel] = None
 
-    model_config = ConfigDict(populate_by_name=True)
+    # Composite: build validator/serializer on first use, not at import
+    model_config = ConfigDict(populate_by_name=True, defer_build=True)
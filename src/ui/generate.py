@@ -1,21 +1,33 @@
 import streamlit as st
 
+# Live preview opens this many levels; deeper nodes expand on click
+_PREVIEW_DEPTH = 2
+
 
 def render_generate_page(stopex):
     """Render the Generate .f3dat page for JSON preview and download."""
     st.write(
         "This would serialize your `stopex` model to an .f3dat-compatible format."
     )
+    # Serialize once in pydantic-core; the previews and download share it.
+    # The full dump, so the exported config keeps default and unset fields.
+    json_str = stopex.model_dump_json(indent=2)
     if st.button("Preview Model JSON"):
-        st.json(stopex.model_dump(exclude_unset=True))
+        with st.expander("Model JSON", expanded=True):
+            st.code(json_str, language="json")
 
     st.markdown("---")
     st.subheader("Live JSON Preview")
-    st.json(stopex.model_dump(exclude_unset=True))
+    # st.json passes a str body through as-is rather than re-dumping a dict
+    if st.checkbox("Fully expand", key="live_json_full_expand"):
+        st.json(json_str)
+    else:
+        st.json(json_str, expanded=_PREVIEW_DEPTH)
 
     st.download_button(
         "Download JSON Config",
-        data=stopex.model_dump_json(indent=2),
+        data=json_str,
         file_name="stopex_config.json",
         mime="application/json",
-    )
\ No newline at end of file
+        on_click="ignore",
+    )
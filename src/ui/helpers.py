@@ -1,4 +1,5 @@
-import tempfile
+import io
+from functools import lru_cache
 from typing import Tuple
 
 import numpy as np
@@ -6,16 +7,120 @@ import plotly.graph_objects as go
 import streamlit as st
 from stl import mesh
 
+from enums import RelGeoAccuracy
+
 __all__ = [
     'ACCURACY_OPTIONS',
+    'zone_multipliers',
     'select_zone_sizes',
     'handle_geometry_section',
+    'dedupe_vertices',
+    'parse_stl',
+    'mesh_trace',
 ]
 
 # Options and parameters
-ACCURACY_OPTIONS = ["Low", "Intermediate", "High"]
+# Enum members, so the selectbox writes typed values without a validation pass
+ACCURACY_OPTIONS = [
+    RelGeoAccuracy.Minimum, RelGeoAccuracy.Intermediate, RelGeoAccuracy.Maximum,
+]
+_ACCURACY_IDX = {v: i for i, v in enumerate(ACCURACY_OPTIONS)}
 _NUM_ZONES = 6
 
+@lru_cache(maxsize=16)
+def zone_multipliers(farfield: float) -> Tuple[float, ...]:
+    """Octree zone sizes for a far-field size, halving at each level."""
+    return tuple(farfield / (1 << i) for i in range(_NUM_ZONES))
+
+def dedupe_vertices(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collapse the per-triangle corners of an STL (n, 3, 3) vectors array into
+    unique vertices. Returns (vertices, faces) where faces is an (n, 3) int32
+    array of row indices into vertices, ready for Mesh3d i/j/k.
+
+    Both arrays are column-major, so the x/y/z and i/j/k column slices handed
+    to Plotly are contiguous float32/int32 buffers for its binary transport.
+    """
+    vertices, inverse = np.unique(
+        vectors.reshape(-1, 3), axis=0, return_inverse=True
+    )
+    vertices = np.asfortranarray(vertices, dtype=np.float32)
+    faces = np.asfortranarray(inverse.reshape(-1, 3), dtype=np.int32)
+    return vertices, faces
+
+# Binary STL layout: 80-byte header, uint32 triangle count, 50-byte records
+_STL_HEADER_SIZE = 84
+_STL_RECORD = np.dtype([
+    ('normals', '<f4', (3,)), ('vectors', '<f4', (3, 3)), ('attr', '<u2'),
+])
+
+def _read_stl_vectors(data, name: str) -> np.ndarray:
+    """
+    Return the (n, 3, 3) triangle corners of an STL held in memory. Binary
+    files are viewed straight as a record array; anything else goes through
+    numpy-stl, skipping its normals pass since only the corners are used.
+    """
+    size = len(data)
+    if size >= _STL_HEADER_SIZE:
+        count = int(np.frombuffer(data, dtype='<u4', count=1, offset=80)[0])
+        # ASCII files can start with "solid" either way; the size is decisive
+        if size == _STL_HEADER_SIZE + count * _STL_RECORD.itemsize:
+            return np.frombuffer(
+                data, dtype=_STL_RECORD, count=count, offset=_STL_HEADER_SIZE
+            )['vectors']
+    return mesh.Mesh.from_file(
+        name, fh=io.BytesIO(data), calculate_normals=False
+    ).vectors
+
+def parse_stl(data, name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse STL bytes (e.g. an upload's buffer) into (vertices, faces)."""
+    return dedupe_vertices(_read_stl_vectors(data, name))
+
+# Previews keep at most this many triangles unless full resolution is asked for
+_PREVIEW_MAX_TRIANGLES = 100_000
+
+def _decimate(
+    vertices: np.ndarray, faces: np.ndarray, max_tri: int = _PREVIEW_MAX_TRIANGLES
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep every k-th triangle so at most max_tri remain, and drop the vertices
+    no kept triangle refers to. Meshes already under the limit pass through.
+    """
+    n_tri = len(faces)
+    if n_tri <= max_tri:
+        return vertices, faces
+    step = -(-n_tri // max_tri)
+    used, inverse = np.unique(faces[::step], return_inverse=True)
+    faces = np.asfortranarray(inverse.reshape(-1, 3), dtype=np.int32)
+    return np.asfortranarray(vertices[used]), faces
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _mesh_trace(
+    file_id: str, color: str, opacity: float, full: bool,
+    _vertices: np.ndarray, _faces: np.ndarray,
+) -> go.Mesh3d:
+    """Build a Mesh3d trace once per upload and style; arrays are not hashed."""
+    if not full:
+        _vertices, _faces = _decimate(_vertices, _faces)
+    return go.Mesh3d(
+        x=_vertices[:, 0], y=_vertices[:, 1], z=_vertices[:, 2],
+        i=_faces[:, 0], j=_faces[:, 1], k=_faces[:, 2],
+        opacity=opacity, color=color,
+    )
+
+def mesh_trace(
+    key: str, color: str, opacity: float, full: bool = False
+) -> go.Mesh3d:
+    """
+    Return a cached Mesh3d trace for the STL uploaded in section `key`,
+    decimated for preview unless `full` is set. go.Figure copies the traces
+    it is given, so the shared cached trace is never mutated by callers.
+    """
+    vertices, faces = st.session_state[f"{key}_mesh"]
+    return _mesh_trace(
+        st.session_state[f"{key}_file_id"], color, opacity, full, vertices, faces
+    )
+
 def select_zone_sizes(
     label: str,
     current_min: float,
@@ -27,7 +132,7 @@ def select_zone_sizes(
     Render two selectboxes for minimum and initial zone sizes based on octree multipliers.
     Returns the selected (min_zonesize, init_zonesize).
     """
-    multipliers = [farfield / (2 ** i) for i in range(_NUM_ZONES)]
+    multipliers = zone_multipliers(farfield)
     try:
         min_idx = multipliers.index(current_min)
     except (ValueError, TypeError):
@@ -57,14 +162,44 @@ def handle_geometry_section(
     Unified handler for a geometry section: file upload, filename input,
     zone-size selection, accuracy, densification, and STL preview.
     Modifies the given detail object in place.
+
+    The inputs sit in one form, so edits apply in one rerun on submit; the
+    preview and its resolution toggle follow the form so they respond at once.
     """
+    with st.form(f"{key}_form"):
+        _geometry_inputs(label, key, detail, farfield)
+        st.form_submit_button("Apply")
+    # STL preview if available
+    if detail.file and detail.file.endswith(".stl") and st.session_state.get(f"{key}_mesh"):
+        full = st.checkbox("Full resolution", key=f"{key}_full_res")
+        try:
+            fig = go.Figure(data=[mesh_trace(key, color, 0.8, full)])
+            fig.update_layout(
+                title=f"{label} Geometry Preview", margin=dict(l=0, r=0, t=30, b=0),
+                scene=dict(aspectmode='data')
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        except Exception as e:
+            st.error(f"Failed to preview STL: {e}")
+
+def _geometry_inputs(label: str, key: str, detail: object, farfield: float) -> None:
+    """Render a geometry section's form inputs and write them to detail."""
     uploaded = st.file_uploader(
         f"{label} Geometry File", type=["stl", "dxf"], key=f"{key}_file"
     )
+    # The uploader hands back the same file on every rerun; parse the STL in
+    # memory only when a new upload arrives and keep the arrays for reruns.
+    if uploaded and st.session_state.get(f"{key}_file_id") != uploaded.file_id:
+        st.session_state[f"{key}_mesh"] = None
+        if uploaded.name.lower().endswith(".stl"):
+            try:
+                st.session_state[f"{key}_mesh"] = parse_stl(
+                    uploaded.getbuffer(), uploaded.name
+                )
+            except Exception as e:
+                st.error(f"Failed to read STL: {e}")
+        st.session_state[f"{key}_file_id"] = uploaded.file_id
     if uploaded:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".stl", mode="wb") as tmp:
-            tmp.write(uploaded.getbuffer())
-            st.session_state[f"{key}_path"] = tmp.name
         st.session_state[f"{key}_shadow"] = uploaded
     shadow = st.session_state.get(f"{key}_shadow")
     if shadow:
@@ -83,7 +218,8 @@ def handle_geometry_section(
     # Accuracy and densification
     detail.geometry_accuracy = st.selectbox(
         "Geometry Accuracy", ACCURACY_OPTIONS,
-        index=ACCURACY_OPTIONS.index(detail.geometry_accuracy or "Intermediate"),
+        format_func=lambda v: v.label,
+        index=_ACCURACY_IDX.get(detail.geometry_accuracy, 1),
         key=f"{key}_accuracy"
     )
     detail.zone_dens_dist = st.number_input(
@@ -92,23 +228,3 @@ def handle_geometry_section(
         step=0.5,
         key=f"{key}_densify"
     )
-    # STL preview if available
-    path = st.session_state.get(f"{key}_path")
-    if detail.file and detail.file.endswith(".stl") and path:
-        try:
-            stl_mesh = mesh.Mesh.from_file(path)
-            vertices = np.reshape(stl_mesh.vectors, (-1, 3))
-            x, y, z = vertices[:, 0], vertices[:, 1], vertices[:, 2]
-            idx = range(0, len(vertices), 3)
-            i, j, k = list(idx), [x + 1 for x in idx], [x + 2 for x in idx]
-            fig = go.Figure(data=[
-                go.Mesh3d(x=x, y=y, z=z, i=i, j=j, k=k,
-                           opacity=0.8, color=color)
-            ])
-            fig.update_layout(
-                title=f"{label} Geometry Preview", margin=dict(l=0, r=0, t=30, b=0),
-                scene=dict(aspectmode='data')
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        except Exception as e:
-            st.error(f"Failed to preview STL: {e}")
\ No newline at end of file
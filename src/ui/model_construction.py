@@ -1,34 +1,51 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
-from stl import mesh
 
+from enums import ModelConstructionDetailName
 from models import ModelConstructionDetail
-from ui.helpers import handle_geometry_section
+from ui.helpers import handle_geometry_section, mesh_trace
+
+_SECTIONS = [
+    "Stoping", "Topography", "Development",
+    "Area of Interest", "Historical Mining", "Summary",
+]
+
+
+def _get_detail(key, name):
+    """Return the session's detail record for a section, creating it once."""
+    if key not in st.session_state:
+        st.session_state[key] = ModelConstructionDetail(name=name.value)
+    return st.session_state[key]
 
 
 def render_model_construction_page(stopex):
     """Render the Model Construction page with Stoping, Topo, Dev, AOI, Hist, and Summary."""
-    tabs = st.tabs([
-        "Stoping", "Topography", "Development",
-        "Area of Interest", "Historical Mining", "Summary"
-    ])
+    # A radio stands in for st.tabs: tabs run every body on each rerun, so the
+    # Summary meshes were rebuilt while editing any other section
+    active = st.radio(
+        "Section", _SECTIONS, horizontal=True, key="_mc_tab",
+        label_visibility="collapsed",
+    )
     farfield = stopex.settings.farfieldzonesize or 48
-    stopex.model_construction.model_construction_detail.clear()
+    stoping_detail = _get_detail("_det_stoping", ModelConstructionDetailName.Stoping)
+    topo_detail = _get_detail("_det_topo", ModelConstructionDetailName.Topography)
+    dev_detail = _get_detail("_det_dev", ModelConstructionDetailName.Development)
+    aoi_detail = _get_detail("_det_aoi", ModelConstructionDetailName.AreaOfInterest)
+    hist_detail = _get_detail("_det_hist", ModelConstructionDetailName.HistoricalMining)
+
+    # handle_geometry_section batches each section's inputs in one form; the
+    # Include toggles stay outside it to show/hide sections at once
 
     # -- Stoping
-    with tabs[0]:
+    if active == "Stoping":
         st.subheader("Stoping")
-        stoping_detail = ModelConstructionDetail()
         handle_geometry_section("Stoping", "stoping", stoping_detail, farfield, "lightblue")
-        stopex.model_construction.stoping_enabled = True
-        stopex.model_construction.model_construction_detail.append("stoping")
+    stopex.model_construction.stoping_enabled = True
 
     # -- Topography
-    with tabs[1]:
+    if active == "Topography":
         st.subheader("Topography")
-        topo_detail = ModelConstructionDetail()
         stopex.model_construction.topo_enabled = st.checkbox(
             "Include Topography", value=stopex.model_construction.topo_enabled,
             key="topo_enabled"
@@ -37,12 +54,10 @@ def render_model_construction_page(stopex):
             handle_geometry_section(
                 "Topography", "topo", topo_detail, farfield, "lightgreen"
             )
-            stopex.model_construction.model_construction_detail.append("topography")
 
     # -- Development
-    with tabs[2]:
+    if active == "Development":
         st.subheader("Development")
-        dev_detail = ModelConstructionDetail()
         stopex.model_construction.dev_enabled = st.checkbox(
             "Include Development", value=stopex.model_construction.dev_enabled,
             key="dev_enabled"
@@ -51,12 +66,10 @@ def render_model_construction_page(stopex):
             handle_geometry_section(
                 "Development", "dev", dev_detail, farfield, "lightyellow"
             )
-            stopex.model_construction.model_construction_detail.append("development")
 
     # -- Area of Interest
-    with tabs[3]:
+    if active == "Area of Interest":
         st.subheader("Area of Interest")
-        aoi_detail = ModelConstructionDetail()
         stopex.model_construction.aoi_enabled = st.checkbox(
             "Include AOI", value=stopex.model_construction.aoi_enabled,
             key="aoi_enabled"
@@ -65,12 +78,10 @@ def render_model_construction_page(stopex):
             handle_geometry_section(
                 "Area of Interest", "aoi", aoi_detail, farfield, "lightcoral"
             )
-            stopex.model_construction.model_construction_detail.append("area_of_interest")
 
     # -- Historical Mining
-    with tabs[4]:
+    if active == "Historical Mining":
         st.subheader("Historical Mining")
-        hist_detail = ModelConstructionDetail()
         stopex.model_construction.hist_enabled = st.checkbox(
             "Include Historical Mining",
             value=stopex.model_construction.hist_enabled,
@@ -80,10 +91,23 @@ def render_model_construction_page(stopex):
             handle_geometry_section(
                 "Historical Mining", "hist", hist_detail, farfield, "lightgray"
             )
-            stopex.model_construction.model_construction_detail.append("historical")
+
+    # Keep the typed detail records on stopex, whichever section is showing;
+    # model_construction_detail holds Bubble record IDs and is left untouched.
+    # Assign a new list (rather than editing in place) so pydantic records the
+    # field as set.
+    stopex.model_construction_details = [stoping_detail, *(
+        detail for enabled, detail in (
+            (stopex.model_construction.topo_enabled, topo_detail),
+            (stopex.model_construction.dev_enabled, dev_detail),
+            (stopex.model_construction.aoi_enabled, aoi_detail),
+            (stopex.model_construction.hist_enabled, hist_detail),
+        )
+        if enabled
+    )]
 
     # -- Summary
-    with tabs[5]:
+    if active == "Summary":
         st.subheader("Summary")
         check, cross = "✅", "❌"
         summary_rows = []
@@ -93,7 +117,7 @@ def render_model_construction_page(stopex):
             "Enabled": check,
             "Min Zone": stoping_detail.min_zonesize,
             "Init Zone": stoping_detail.init_zonesize,
-            "Accuracy": stoping_detail.geometry_accuracy or "",
+            "Accuracy": getattr(stoping_detail.geometry_accuracy, "label", ""),
             "Densify": stoping_detail.zone_dens_dist,
             "File": stoping_detail.file or "",
         })
@@ -110,7 +134,7 @@ def render_model_construction_page(stopex):
                 "Enabled": check if enabled else cross,
                 "Min Zone": obj.min_zonesize,
                 "Init Zone": obj.init_zonesize,
-                "Accuracy": obj.geometry_accuracy or "",
+                "Accuracy": getattr(obj.geometry_accuracy, "label", ""),
                 "Densify": obj.zone_dens_dist,
                 "File": obj.file or "",
             })
@@ -119,45 +143,55 @@ def render_model_construction_page(stopex):
 
         st.markdown("---")
         # 3D preview of combined meshes
-        all_meshes = []
         colors = {
             "stoping": "lightblue", "topo": "lightgreen",
             "dev": "lightyellow", "aoi": "lightcoral",
             "hist": "lightgray",
         }
         file_keys = [
-            ("stoping_path", "stoping"),
-            ("topo_path", "topo"),
-            ("dev_path", "dev"),
-            ("aoi_path", "aoi"),
-            ("hist_path", "hist"),
+            ("stoping_mesh", "stoping"),
+            ("topo_mesh", "topo"),
+            ("dev_mesh", "dev"),
+            ("aoi_mesh", "aoi"),
+            ("hist_mesh", "hist"),
         ]
         vis = {}
         for i, (_, lbl) in enumerate(file_keys):
             vis[lbl] = st.checkbox(lbl.upper(), value=True, key=f"vis_{lbl}",
                                     help=f"Show {lbl}" ,
                                     )
+        full = st.checkbox(
+            "Full resolution", key="summary_full_res",
+            help="Render every triangle instead of a decimated preview",
+        )
+        # Figure signature: visible sections, their uploads and the resolution.
+        # The assembled figure is reused across reruns until this changes.
+        visible = []
         for key, lbl in file_keys:
-            path = st.session_state.get(key)
-            if path and vis.get(lbl):
+            if st.session_state.get(key) and vis.get(lbl):
+                visible.append((lbl, st.session_state.get(f"{lbl}_file_id")))
+        signature = (full, tuple(visible))
+        cached = st.session_state.get("_summary_fig")
+        if cached and cached[0] == signature:
+            fig = cached[1]
+        else:
+            all_meshes = []
+            complete = True
+            for lbl, _ in visible:
                 try:
-                    mesh_obj = mesh.Mesh.from_file(path)
-                    verts = np.reshape(mesh_obj.vectors, (-1, 3))
-                    x, y, z = verts[:, 0], verts[:, 1], verts[:, 2]
-                    idx = range(0, len(verts), 3)
-                    all_meshes.append(
-                        go.Mesh3d(
-                            x=x, y=y, z=z,
-                            i=list(idx), j=[i+1 for i in idx], k=[i+2 for i in idx],
-                            opacity=0.5, color=colors[lbl]
-                        )
-                    )
+                    all_meshes.append(mesh_trace(lbl, colors[lbl], 0.5, full))
                 except Exception:
+                    complete = False
                     st.warning(f"Could not load {lbl}")
-        if all_meshes:
-            fig = go.Figure(data=all_meshes)
-            fig.update_layout(
-                title="Preview", margin=dict(l=0, r=0, t=30, b=0),
-                scene=dict(aspectmode='data')
-            )
-            st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+            fig = None
+            if all_meshes:
+                fig = go.Figure(data=all_meshes)
+                fig.update_layout(
+                    title="Preview", margin=dict(l=0, r=0, t=30, b=0),
+                    scene=dict(aspectmode='data')
+                )
+            # Only remember figures that loaded fully, so failures re-warn
+            if complete:
+                st.session_state["_summary_fig"] = (signature, fig)
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
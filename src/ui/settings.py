@@ -1,6 +1,9 @@
+import math
+
 import streamlit as st
 
 from enums import FLACVersion
+from ui.helpers import zone_multipliers
 
 
 def render_settings_page(stopex):
@@ -29,61 +32,69 @@ def render_settings_page(stopex):
         )
 
     with st.expander("Advanced Options"):
+        # The import toggles stay outside the form so their inputs show/hide
+        # at once; the inputs themselves are batched into one rerun on Apply
         stopex.settings.import_mesh = st.checkbox(
             "Do you want to import model mesh?",
             value=stopex.settings.import_mesh,
         )
-        if stopex.settings.import_mesh:
-            mesh_file = st.file_uploader(
-                "Select mesh file (for local path capture only)",
-                key="mesh_file_selector",
-            )
-            if mesh_file:
-                stopex.settings.import_mesh_file = mesh_file.name
-
-            mesh_path = st.text_input(
-                "Local path to model mesh file",
-                value=stopex.settings.import_mesh_file or "",
-            )
-            if mesh_path != stopex.settings.import_mesh_file:
-                stopex.settings.import_mesh_file = mesh_path
-
         stopex.settings.import_map3D = st.checkbox(
             "Do you want to import geometries from a Map3D model?",
             value=stopex.settings.import_map3D,
         )
-        if stopex.settings.import_map3D:
-            map3d_file = st.file_uploader(
-                "Select Map3D file (for local path capture only)",
-                key="map3d_file_selector",
-            )
-            if map3d_file:
-                stopex.settings.import_map3D_file = map3d_file.name
+        # An empty form would still draw its Apply button
+        if stopex.settings.import_mesh or stopex.settings.import_map3D:
+            with st.form("advanced_options_form"):
+                if stopex.settings.import_mesh:
+                    mesh_file = st.file_uploader(
+                        "Select mesh file (for local path capture only)",
+                        key="mesh_file_selector",
+                    )
+                    if mesh_file:
+                        stopex.settings.import_mesh_file = mesh_file.name
 
-            map3d_path = st.text_input(
-                "Local path to Map3D geometry file",
-                value=stopex.settings.import_map3D_file or "",
-            )
-            if map3d_path != stopex.settings.import_map3D_file:
-                stopex.settings.import_map3D_file = map3d_path
+                    mesh_path = st.text_input(
+                        "Local path to model mesh file",
+                        value=stopex.settings.import_mesh_file or "",
+                    )
+                    if mesh_path != stopex.settings.import_mesh_file:
+                        stopex.settings.import_mesh_file = mesh_path
+
+                if stopex.settings.import_map3D:
+                    map3d_file = st.file_uploader(
+                        "Select Map3D file (for local path capture only)",
+                        key="map3d_file_selector",
+                    )
+                    if map3d_file:
+                        stopex.settings.import_map3D_file = map3d_file.name
+
+                    map3d_path = st.text_input(
+                        "Local path to Map3D geometry file",
+                        value=stopex.settings.import_map3D_file or "",
+                    )
+                    if map3d_path != stopex.settings.import_map3D_file:
+                        stopex.settings.import_map3D_file = map3d_path
+                st.form_submit_button("Apply")
 
     st.markdown("---")
     st.subheader("Global Octree Meshing Parameters")
-    stopex.settings.target_zones = st.number_input(
-        "Target number of zones in the model (m)",
-        value=stopex.settings.target_zones or 2000000,
-        step=100000,
-    )
-    stopex.settings.farfieldzonesize = st.number_input(
-        "Far Field Zone Size (m)",
-        value=stopex.settings.farfieldzonesize or 48,
-        step=1,
-    )
-    stopex.settings.model_boundary_offset = st.number_input(
-        "Model Boundary Offset (m)",
-        value=stopex.settings.model_boundary_offset or 400,
-        step=10,
-    )
+    with st.form("octree_form"):
+        stopex.settings.target_zones = st.number_input(
+            "Target number of zones in the model (m)",
+            value=stopex.settings.target_zones or 2000000,
+            step=100000,
+        )
+        stopex.settings.farfieldzonesize = st.number_input(
+            "Far Field Zone Size (m)",
+            value=stopex.settings.farfieldzonesize or 48,
+            step=1,
+        )
+        stopex.settings.model_boundary_offset = st.number_input(
+            "Model Boundary Offset (m)",
+            value=stopex.settings.model_boundary_offset or 400,
+            step=10,
+        )
+        st.form_submit_button("Apply")
 
     custom = st.checkbox(
         "Use custom zone size multiplier?",
@@ -101,12 +112,15 @@ def render_settings_page(stopex):
         stopex.settings.zone_size_number = None
         stopex.settings.predefined_zonesize = True
         farfield = stopex.settings.farfieldzonesize or 48
-        predefined = [farfield / (2 ** i) for i in range(6)]
+        # Same cached octree table as the geometry zone-size selectors
+        predefined = zone_multipliers(farfield)
         try:
             current = float(stopex.settings.zonesize_dropdown)
             ratio = farfield / current
-            default_idx = int(round(ratio).bit_length() - 1)
-        except (ValueError, TypeError):
+            # Nearest octree level, clamped to the predefined options; a
+            # tiny multiplier overflows the ratio to inf and round() raises
+            default_idx = max(0, min(len(predefined) - 1, round(math.log2(ratio))))
+        except (ValueError, TypeError, ZeroDivisionError, OverflowError):
             default_idx = 3
         dropdown_value = st.selectbox(
             "Choose predefined Zone Size Multiplier",
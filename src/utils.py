@@ -1,27 +1,51 @@
+import hmac
+import io
+import logging
+import operator
 import os
-from enum import Enum
+from enum import Enum, IntEnum
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
 
 from typing import List, Dict, Set
 from collections import defaultdict
+from functools import lru_cache
+from itertools import chain
 import re
 
+import anyio
 import httpx
 from dotenv import load_dotenv
 from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from bubble_base import BubbleBaseModel
+from bubble_base import BubbleBaseModel, parse_enum
+from enums import DomainType, InsituStressType
+from filenames import extract_filename_from_url, sanitize_data  # noqa: F401
 from logging_config import get_logger
 from mappings import FIELD_MAPPING
 from models import FaultDirection
 
 logger = get_logger("utils")
 
+# Compiled once at import; used per line / per template below
+_FISH_PROJECT_NAME_RE = re.compile(
+    r"^\s*fish\s+set\s+@project_name\s*=\s*['\"]?(.*?)['\"]?\s*$", re.IGNORECASE
+)
+_PLACEHOLDER_RE = re.compile(r"<([^>]+)>")
+_FISH_SET_RE = re.compile(r"fish set @([\w\d_]+)\s*=\s*['\"]?(.+?)['\"]?$")
+# Looser variant for find_matching_objects_from_dict: any case and spacing
+_FISH_PATTERN = re.compile(
+    r"fish\s+set\s+@([\w\d_]+)\s*=\s*['\"]?(.*?)['\"]?\s*$", re.IGNORECASE
+)
+_VALUE_TERMINATORS = (";", ",")
+
 # Load environment variables
 load_dotenv()
 
+# Read once at import (after .env is loaded); bytes for hmac.compare_digest
+_EXPECTED_BEARER_TOKEN = (os.getenv("BUBBLE_API_KEY") or "").encode()
+
 # Security scheme
 security = HTTPBearer()
 
@@ -33,18 +57,16 @@ get_credentials = Security(security)
 
 def verify_bearer_token(credentials: HTTPAuthorizationCredentials = Depends(get_credentials)):
     """Verify Bearer token in request header."""
-    expected_token = os.getenv("BUBBLE_API_KEY")
-    if not expected_token or credentials.credentials != expected_token:
+    # Constant-time comparison so response timing does not leak the token
+    if not _EXPECTED_BEARER_TOKEN or not hmac.compare_digest(
+        credentials.credentials.encode(), _EXPECTED_BEARER_TOKEN
+    ):
         raise HTTPException(status_code=401, detail="Invalid or missing Bearer token")
 
 def map_request_fields(request_data: dict[str, Any]) -> dict[str, Any]:
     """Map incoming fields to the expected fields based on FIELD_MAPPING."""
-    mapped_data = {}
-    for key, value in request_data.items():
-        # Use the mapped field name if it exists, otherwise keep the original key
-        mapped_key = FIELD_MAPPING.get(key, key)
-        mapped_data[mapped_key] = value
-    return mapped_data
+    # Use the mapped field name if it exists, otherwise keep the original key
+    return {FIELD_MAPPING.get(key, key): value for key, value in request_data.items()}
 
 def log_request(request_data: Any, message_type: str = None):
     """
@@ -65,14 +87,6 @@ def log_error(error_message):
     """Log an error message with a standardized format."""
     logger.error(f"❌ Error | {error_message}")
 
-def sanitize_data(data: str):
-    """Sanitize project name by removing special characters."""
-    return (
-        ''.join(e for e in data if e.isalnum() or e in [" ", "-"])
-        .replace(' ', '_')
-        .replace('-', '_')
-    )
-    
 def make_f3dat_filename(project_id: str, project_name: Optional[str], app_version: str) -> str:
     """
     Generates a safe filename for .f3dat using project_name if available,
@@ -86,9 +100,9 @@ def extract_project_name_from_f3dat(contents: str) -> Optional[str]:
     Parse .f3dat contents to extract the project name (fish set @Project_Name = '...').
     Returns the extracted name, or None if not found.
     """
-    pattern = r"^\s*fish\s+set\s+@project_name\s*=\s*['\"]?(.*?)['\"]?\s*$"
+    # The pattern's \s* anchors absorb surrounding whitespace, so no strip()
     for line in contents.splitlines():
-        match = re.match(pattern, line.strip(), flags=re.IGNORECASE)
+        match = _FISH_PROJECT_NAME_RE.match(line)
         if match:
             return match.group(1).strip()
     return None
@@ -102,29 +116,9 @@ def resolve_placeholders(template: str, replacements: Dict[str, str]) -> str:
         key = match.group(1)
         return replacements.get(key, match.group(0))
 
-    return re.sub(r"<([^>]+)>", _repl, template)
-
-def extract_filename_from_url(url: str) -> str:
-    """Extract the filename from a URL with proper handling of URL encoding."""
-    from urllib.parse import unquote, urlparse
-
-    # Parse the URL
-    parsed_url = urlparse(url)
-
-    # Get the path component and extract the last part as the filename
-    path = parsed_url.path
-    filename = os.path.basename(unquote(path))
-
-    # If filename is empty, generate a unique name
-    if not filename:
-        import uuid
+    return _PLACEHOLDER_RE.sub(_repl, template)
 
-        filename = f"file_{uuid.uuid4().hex[:8]}.stl"
-
-    # Ensure filename is sanitized
-    filename = sanitize_data(filename)
-
-    return filename
+_DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
 
 async def fetch_data(api_url: str) -> dict:
     """Fetch data from the given API URL."""
@@ -141,24 +135,42 @@ async def download_file(file_url: str, save_directory: Path) -> str:
     file_name = file_url.split("/")[-1]
     save_path = save_directory / file_name
 
+    # Stream to disk so only one chunk is held in memory at a time; the file
+    # is opened and written in a worker thread so the event loop never blocks.
+    # A client per call: an AsyncClient is bound to the loop that opened it.
     async with httpx.AsyncClient() as client:
-        response = await client.get(file_url)
-        response.raise_for_status()
-        with open(save_path, "wb") as f:
-            f.write(response.content)
+        async with client.stream("GET", file_url) as response:
+            response.raise_for_status()
+            async with await anyio.open_file(save_path, "wb") as f:
+                async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
 
     return str(save_path)
 
 def strip_outer_quotes(value: Any) -> Any:
     """Remove surrounding single quotes from a string, if present."""
-    if isinstance(value, str) and len(value) >= 2 and value.startswith("'") and value.endswith("'"):
+    if isinstance(value, str) and len(value) >= 2 and value[0] == "'" and value[-1] == "'":
         return value[1:-1]
     return value
 
+# Payload leaves that clean_payload returns unchanged
+_PAYLOAD_LEAF_TYPES = frozenset({int, float, bool, type(None)})
+
 def clean_payload(data: Any) -> Any:
     """
     Recursively strip outer single quotes from all string values in a payload.
     """
+    # Exact-type checks first: decoded JSON is plain dicts, lists and leaves
+    data_type = type(data)
+    if data_type is dict:
+        return {k: clean_payload(v) for k, v in data.items()}
+    if data_type is list:
+        return [clean_payload(v) for v in data]
+    if data_type is str:
+        return strip_outer_quotes(data)
+    if data_type in _PAYLOAD_LEAF_TYPES:
+        return data
+    # Subclasses (e.g. OrderedDict, str enums) take the general path
     if isinstance(data, dict):
         return {k: clean_payload(v) for k, v in data.items()}
     if isinstance(data, list):
@@ -172,6 +184,71 @@ def clean_payload(data: Any) -> Any:
 # ============================== #
 
 
+def _flip_octree_flag(value: Any) -> Any:
+    """Octree_Mesh is stored inverted: flip "true"/"false" to "no"/"yes"."""
+    if isinstance(value, str):
+        flag = value.lower()
+        if flag == "true":
+            value = "no"
+        elif flag == "false":
+            value = "yes"
+    return value
+
+_ANISOTROPY_DIRECTION_MAP = {
+    "Top": "T",
+    "Down": "D",
+    "North": "N",
+    "South": "S",
+    "East": "E",
+    "West": "W",
+    "top": "T",
+    "down": "D",
+    "north": "N",
+    "south": "S",
+    "east": "E",
+    "west": "W",
+}
+
+def _anisotropy_direction_letter(value: Any) -> Any:
+    """Convert an anisotropy direction name to its single letter."""
+    # Strings outside the map pass through unchanged
+    if isinstance(value, str):
+        return _ANISOTROPY_DIRECTION_MAP.get(value, value)
+    # If it has a letter attribute (FaultDirection enum)
+    if hasattr(value, 'letter'):
+        value = value.letter
+        logger.debug(f"Extracting letter from direction enum: {value}")
+    return value
+
+def _normal_direction_letter(value: Any) -> Any:
+    """Map a Fault normal_direction value to its single-letter code."""
+    try:
+        # Attempt to parse value into enum member
+        enum_member = parse_enum(FaultDirection, value, default=None)
+        if enum_member:
+            value = enum_member.first_letter()
+        else:
+            # Fallback: uppercase first letter of cleaned string
+            s = str(value).strip().strip("'\"")
+            value = s[0].upper() if s else value
+    except Exception:
+        # Leave original value if mapping fails
+        pass
+    return value
+
+# Keys embed object names, so the cache is bounded
+@lru_cache(maxsize=1024)
+def _key_transforms(key: str) -> Tuple[Callable[[Any], Any], ...]:
+    """The value conversions config_line applies for `key`, in order."""
+    transforms = []
+    if key == "Octree_Mesh":
+        transforms.append(_flip_octree_flag)
+    if "anisotropy_surface_normal_direction" in key:
+        transforms.append(_anisotropy_direction_letter)
+    if key.lower().endswith("normal_direction"):
+        transforms.append(_normal_direction_letter)
+    return tuple(transforms)
+
 class ConfigBuilder:
     """
     Base class for building configuration files with standardized formatting.
@@ -179,16 +256,20 @@ class ConfigBuilder:
     """
 
     def __init__(self, prefix: str = ""):
-        self.lines = []
+        self._buf = io.StringIO()
+        # Written before each line but the first, matching "\n".join(lines)
+        self._sep = ""
         self.prefix = prefix
 
     def add_line(self, text: str) -> None:
         """Add a raw text line to the configuration."""
-        self.lines.append(text)
+        self._buf.write(self._sep)
+        self._buf.write(text)
+        self._sep = "\n"
 
     def newline(self) -> None:
         """Add an empty line to the configuration."""
-        self.lines.append("")
+        self.add_line("")
 
     def add_section_header(self, title: str) -> None:
         """Add a main section header with standardized formatting."""
@@ -212,71 +293,18 @@ class ConfigBuilder:
             value: The value to set (strings will be quoted)
         """
         # Convert IntEnum (e.g., DomainType, DensificationLevel) to numeric value
-        try:
-            from enum import IntEnum
-            if isinstance(value, IntEnum):
-                value = value.value
-        except ImportError:
-            pass
-        # Debug logging for densification fields (optional)
-        if "densification" in key.lower():
-            # print(f"✨ config_line for {key}: value={value} (type: {type(value)})")
-            pass
+        if isinstance(value, IntEnum):
+            value = value.value
 
         # Special case for 'notfound' value
         if value == 'notfound':
             self.add_line(f"{self.prefix}set @{key}= ''")
             return
 
-        # Special case for Octree_Mesh to flip yes/no
-        if key == "Octree_Mesh" and isinstance(value, str):
-            if value.lower() == "true" or value is True:
-                value = "no"
-            elif value.lower() == "false" or value is False:
-                value = "yes"
-
-        # Special case for anisotropy direction - convert to single letter
-        if "anisotropy_surface_normal_direction" in key:
-            direction_map = {
-                "Top": "T",
-                "Down": "D",
-                "North": "N",
-                "South": "S",
-                "East": "E",
-                "West": "W",
-                "top": "T",
-                "down": "D",
-                "north": "N",
-                "south": "S",
-                "east": "E",
-                "west": "W",
-            }
+        # Key-specific conversions (Octree flip, direction letters)
+        for transform in _key_transforms(key):
+            value = transform(value)
 
-            # If it's a string and matches our map
-            if isinstance(value, str) and value in direction_map:
-                value = direction_map[value]
-                # print(f"Converting direction {key} from full name to letter: {value}")
-            # If it has a letter attribute (FaultDirection enum)
-            elif hasattr(value, 'letter'):
-                value = value.letter
-                print(f"Extracting letter from direction enum: {value}")
-
-        # Special case for Fault normal_direction: always map to single-letter code
-        if key.lower().endswith("normal_direction"):
-            try:
-                from bubble_base import parse_enum
-                from enums import FaultDirection
-                # Attempt to parse value into enum member
-                enum_member = parse_enum(FaultDirection, value, default=None)
-                if enum_member:
-                    value = enum_member.first_letter()
-                else:
-                    # Fallback: uppercase first letter of cleaned string
-                    s = str(value).strip().strip("'\"")
-                    value = s[0].upper() if s else value
-            except Exception:
-                # Leave original value if mapping fails
-                pass
         # Convert booleans to "yes"/"no"
         if isinstance(value, bool):
             value = "yes" if value else "no"
@@ -286,18 +314,17 @@ class ConfigBuilder:
             value_str = "''"
         # Format floats in scientific notation to decimal format
         elif isinstance(value, float) or (
-            isinstance(value, str) and str(value).lower().startswith('1e-')
+            isinstance(value, str) and value[:3].lower() == '1e-'
         ):
             try:
                 # If it's already a string in scientific notation (e.g., '1e-05')
-                if isinstance(value, str) and ('e' in str(value).lower()):
+                if isinstance(value, str):
                     value = float(value)
 
-                # Check if this is a small value in scientific notation
-                str_value = str(value)
-                if 'e-' in str_value.lower():
-                    # Convert to decimal format
-                    value_str = f'{float(value):.10f}'.rstrip('0').rstrip('.')
+                # str(float) switches to a negative exponent below 1e-4;
+                # write those out in decimal form instead
+                if value != 0 and abs(value) < 1e-4:
+                    value_str = f'{value:.10f}'.rstrip('0').rstrip('.')
                 else:
                     value_str = str(value)
             except (ValueError, TypeError):
@@ -311,11 +338,6 @@ class ConfigBuilder:
         else:
             value_str = str(value)
 
-        # Log the final output for debug
-        if "densification" in key.lower():
-            # print(f"  - Final output: {self.prefix}set @{key}= {value_str}")
-            pass
-
         self.add_line(f"{self.prefix}set @{key}= {value_str}")
 
     def add_config_line(
@@ -332,8 +354,10 @@ class ConfigBuilder:
         matches the given identifier and outputs a config line for the specified field.
         If a ref_lib is provided, uses mapped_value to fetch the value.
         """
+        target = identifier.lower()
         for item in collection:
-            if str(getattr(item, "name", "")).strip().lower() == identifier.lower():
+            # name may be an option-set enum on some models, so keep str()
+            if str(getattr(item, "name", "")).strip().lower() == target:
                 if ref_lib is not None:
                     val = mapped_value(item, field, ref_lib, default)
                 else:
@@ -362,6 +386,13 @@ class ConfigBuilder:
             with_heading: Whether to print subheadings
             identifier_key: Optional attribute name to use instead of index (e.g., 'name')
         """
+        # Checked once so the per-field debug strings are never built otherwise
+        debug = logger.isEnabledFor(logging.DEBUG)
+        # Templates without placeholders are used as-is, skipping str.format
+        mappings = [
+            (key_template, field_name, default, "{" not in key_template)
+            for key_template, field_name, default in field_mappings
+        ]
         try:
             for index, item in enumerate(collection, start=1):
                 try:
@@ -369,7 +400,7 @@ class ConfigBuilder:
                     if identifier_key:
                         identifier = getattr(item, identifier_key, None)
                         if not identifier:
-                            print(
+                            logger.warning(
                                 f"⚠️ Skipping item with missing identifier '{identifier_key}' in {title}"
                             )
                             continue
@@ -385,16 +416,18 @@ class ConfigBuilder:
                         )
                         self.subheading(heading_label)
 
-                    print(f"✨ Processing {title} {identifier_safe}")
+                    if debug:
+                        logger.debug(f"✨ Processing {title} {identifier_safe}")
 
-                    for key_template, field_name, default in field_mappings:
+                    for key_template, field_name, default, is_literal in mappings:
                         try:
                             # Support key formatting via {index} or {name}
-                            output_key = key_template.format(
-                                index=index, name=identifier_safe
-                            )
-                            key_template.replace("{index}", "<index>").replace(
-                                "{name}", "<name>"
+                            output_key = (
+                                key_template
+                                if is_literal
+                                else key_template.format(
+                                    index=index, name=identifier_safe
+                                )
                             )
 
                             # Custom handling for Densification enums
@@ -432,20 +465,21 @@ class ConfigBuilder:
                                 else:
                                     val = raw_val if raw_val is not None else default
 
-                            print(f"  Output key: {output_key} = {val}")
+                            if debug:
+                                logger.debug(f"  Output key: {output_key} = {val}")
                             self.config_line(output_key, val)
 
                         except Exception as e:
-                            print(f"⚠️ Error in field {field_name}: {e}")
+                            logger.warning(f"⚠️ Error in field {field_name}: {e}")
                             self.config_line(output_key, default)
 
                     self.newline()
 
                 except Exception as e:
-                    print(f"⚠️ Error processing item in {title}: {e}")
+                    logger.warning(f"⚠️ Error processing item in {title}: {e}")
 
         except Exception as e:
-            print(f"⚠️ Critical error in section {title}: {e}")
+            logger.error(f"⚠️ Critical error in section {title}: {e}")
             self.add_line(f"; Error in {title}: {e}")
 
     def add_grouped_section_recursive(
@@ -467,10 +501,6 @@ class ConfigBuilder:
                     (key_template, field_name, default)
         - ref_lib: Optional reference library for mapped values.
         """
-        import logging
-
-        logging.getLogger("utils")
-
         for index, item in enumerate(collection, start=1):
             # Process each group of properties for this item.
             for group_heading, field_mappings in groups:
@@ -635,8 +665,8 @@ class ConfigBuilder:
         # Initialize custom_headings if None
         custom_headings = custom_headings or {}
 
-        # Group objects by name
-        grouped_items = {}
+        # Index objects by name; only the first object per name is used
+        first_by_name = {}
         for item in collection:
             raw_value = getattr(item, name_field, "")
             item_name = (
@@ -645,26 +675,17 @@ class ConfigBuilder:
                 else str(raw_value).strip()
             )
 
-            if not item_name:
-                continue
-
-            if item_name not in grouped_items:
-                grouped_items[item_name] = []
-            grouped_items[item_name].append(item)
+            if item_name and item_name not in first_by_name:
+                first_by_name[item_name] = item
 
-        # Process each group with its specific mappings
-        for name, items in grouped_items.items():
+        # Process each named object with its specific mappings
+        for name, item in first_by_name.items():
             # Skip if we don't have mappings for this name
             if name not in mappings_by_name:
                 logger.debug(f"No mappings defined for {name}, skipping")
                 continue
 
-            # Get mapping for this name and process first item
             mappings = mappings_by_name[name]
-            if not items:
-                continue
-
-            item = items[0]  # Use the first item
 
             # Add subheading if requested
             if add_subheadings:
@@ -701,7 +722,7 @@ class ConfigBuilder:
         Returns:
             String containing the full configuration
         """
-        return "\n".join(self.lines)
+        return self._buf.getvalue()
 
 def get_value(obj: Any, key: str, default: Any = "") -> Any:
     """
@@ -722,6 +743,8 @@ def get_value(obj: Any, key: str, default: Any = "") -> Any:
             return obj.get(key, default)
     return default
 
+_INDEX_KEY = operator.attrgetter("index")
+
 def sort_by_index(items: list) -> list:
     """
     Sort a list of items by their 'index' attribute.
@@ -733,22 +756,80 @@ def sort_by_index(items: list) -> list:
         Sorted list (or original list if sorting fails)
     """
     try:
-        # Assuming each object has an 'index' attribute
+        # Model indices are typed ints: sort on them directly in C
+        if all(type(x.index) is int for x in items):
+            return sorted(items, key=_INDEX_KEY)
+    except AttributeError:
+        pass
+    try:
+        # Otherwise coerce, treating a missing 'index' as 0
         return sorted(items, key=lambda x: int(getattr(x, "index", 0)))
     except (ValueError, TypeError) as e:
         logger.warning(f"Failed to sort items by index: {e}")
         return items
 
+# FaultDirection.__members__ builds a fresh mappingproxy on every access
+_FAULT_DIRECTION_MEMBERS = dict(FaultDirection.__members__)
+# Keys whose empty values default to "no" (matched against the lowercased key)
+_BOOL_INDICATOR_RE = re.compile(r"is_|has_|include_|enabled|custom")
+# Returned by a key handler that leaves the value to the generic handling
+_UNHANDLED = object()
+
+def _rock_or_soil_code(result: Any) -> Any:
+    """Rock_or_Soil fields: faults get numeric codes; domains get string labels."""
+    # Always emit numeric code for rock_or_soil (1=Soil, 2=Rock)
+    if isinstance(result, DomainType):
+        return result.numeric_value
+    # Try converting to int
+    try:
+        iv = int(result)
+        if iv in (1, 2):
+            return iv
+    except Exception:
+        pass
+    # Fallback string matching
+    rs = str(result).strip().lower()
+    if "soil" in rs:
+        return 1
+    if "rock" in rs:
+        return 2
+    # Default to Rock
+    return 2
+
+def _direction_code(result: Any) -> Any:
+    """Direction fields (anisotropy or normal direction) use the letter."""
+    # If it's an enum with letter property
+    if hasattr(result, "letter"):
+        return result.letter
+
+    # If it's a string value, map it to the letter
+    if isinstance(result, str):
+        # Exact name first, then case-insensitive; default to T if no match
+        letter = _ANISOTROPY_DIRECTION_MAP.get(result)
+        if letter is None:
+            letter = _ANISOTROPY_DIRECTION_MAP.get(result.lower(), "T")
+        return letter
+    return _UNHANDLED
+
+# Keys embed object names, so the cache is bounded
+@lru_cache(maxsize=1024)
+def _value_handler(key: str) -> Tuple[bool, Optional[Callable[[Any], Any]]]:
+    """How mapped_value treats `key`: (empty means "no", key-specific handler)."""
+    bool_like = _BOOL_INDICATOR_RE.search(key.lower()) is not None
+    if "_Rock_or_Soil" in key:
+        handler = _rock_or_soil_code
+    # Includes anisotropy_surface_normal_direction
+    elif "_normal_direction" in key:
+        handler = _direction_code
+    else:
+        handler = None
+    return bool_like, handler
+
 def mapped_value(obj: Any, key: str, ref_lib: dict, default: Any = "") -> Any:
     """
     Maps external key to internal field, extracts the value,
     and unwraps Enums for Bubble API compatibility.
     """
-    # Special case for anisotropy surface normal direction - always use the letter
-    is_anisotropy_direction = "anisotropy_surface_normal_direction" in key
-    is_normal_direction = "_normal_direction" in key
-    is_rock_or_soil = "_Rock_or_Soil" in key
-
     mapping = ref_lib.get(key)
     result = (
         get_value(obj, mapping["internal_name"], default)
@@ -759,74 +840,24 @@ def mapped_value(obj: Any, key: str, ref_lib: dict, default: Any = "") -> Any:
     if result is None and default == 'notfound':
         return 'notfound'
 
+    # Key-dependent handling (boolean-like, Rock_or_Soil, directions)
+    bool_like, handler = _value_handler(key)
+
     # Handle empty values for boolean-like fields
-    if (result is None or result == "") and any(
-        indicator in key.lower()
-        for indicator in ["is_", "has_", "include_", "enabled", "custom"]
-    ):
+    if bool_like and (result is None or result == ""):
         return "no"  # Default empty booleans to 'no'
 
     # Convert Python booleans to yes/no strings
     if isinstance(result, bool):
         return "yes" if result else "no"
 
-    # Handle Rock_or_Soil fields: faults get numeric codes; domains get string labels
-    if is_rock_or_soil:
-        # Always emit numeric code for rock_or_soil (1=Soil, 2=Rock)
-        try:
-            from enums import DomainType
-            if isinstance(result, DomainType):
-                return result.numeric_value
-        except ImportError:
-            pass
-        # Try converting to int
-        try:
-            iv = int(result)
-            if iv in (1, 2):
-                return iv
-        except Exception:
-            pass
-        # Fallback string matching
-        rs = str(result).strip().lower()
-        if "soil" in rs:
-            return 1
-        if "rock" in rs:
-            return 2
-        # Default to Rock
-        return 2
-
-    # Handle direction fields (anisotropy or normal direction)
-    if is_anisotropy_direction or is_normal_direction:
-        # If it's an enum with letter property
-        if hasattr(result, "letter"):
-            return result.letter
-
-        # If it's a string value, map it to the letter
-        if isinstance(result, str):
-            direction_map = {
-                "Top": "T",
-                "Down": "D",
-                "North": "N",
-                "South": "S",
-                "East": "E",
-                "West": "W",
-            }
-
-            # Try case-sensitive first, then try case-insensitive
-            if result in direction_map:
-                return direction_map[result]
-
-            # Try lowercase match
-            for k, v in direction_map.items():
-                if result.lower() == k.lower():
-                    return v
-
-            # Default to T if no match is found
-            return "T"
+    if handler is not None:
+        converted = handler(result)
+        if converted is not _UNHANDLED:
+            return converted
 
     # Handle enums
     if isinstance(result, Enum):
-        type(result)
         if hasattr(result, "letter"):  # Covers FaultDirection
             return result.letter
         elif hasattr(result, "numeric_value"):  # Covers DensificationLevel
@@ -835,8 +866,8 @@ def mapped_value(obj: Any, key: str, ref_lib: dict, default: Any = "") -> Any:
             return result.value if hasattr(result, "value") else str(result)
 
     # Handle sloppy stringified enums
-    if isinstance(result, str) and result in FaultDirection.__members__:
-        return FaultDirection[result].letter
+    if isinstance(result, str) and (member := _FAULT_DIRECTION_MEMBERS.get(result)) is not None:
+        return member.letter
 
     return result
 
@@ -869,19 +900,22 @@ def bubbleify_composite_model(composite_obj: BubbleBaseModel) -> dict[str, Any]:
 
     return composite_obj.to_bubble_dict()
 
+@lru_cache(maxsize=512)
+def _attr_path_getter(dotted_attr: str) -> Callable[[Any], Any]:
+    """Compile a dotted attribute path into a C-level getter, once per path."""
+    return operator.attrgetter(dotted_attr)
+
 def safe_get(obj: Any, dotted_attr: str, default: Any = None) -> Any:
     """
     Safely get a (potentially dotted) attribute path from an object.
     Example: safe_get(obj, 'project.project_name', 'fallback')
     """
     try:
-        for attr in dotted_attr.split("."):
-            obj = getattr(obj, attr)
-            if obj is None:
-                return default
-        return obj
+        # A None partway along raises AttributeError on the next step
+        value = _attr_path_getter(dotted_attr)(obj)
     except AttributeError:
         return default
+    return default if value is None else value
 
 def safe_config_line(
     builder,
@@ -924,6 +958,62 @@ def get_items_by_type(data: dict, type_key: str) -> list[dict]:
         return items
     return []
 
+# Per-prefix/per-key patterns, compiled on first use and shared across calls
+@lru_cache(maxsize=None)
+def _step_pattern(prefix: str) -> re.Pattern:
+    """Match 'step1' or '@step2' and capture the index."""
+    return re.compile(rf"@?{re.escape(prefix)}(\d+)\b", re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def _index_pattern(prefix: str) -> re.Pattern:
+    """Match a numeric suffix after prefix (e.g. 'Domain1') and capture it."""
+    return re.compile(rf"{re.escape(prefix)}(\d+)", re.IGNORECASE)
+
+@lru_cache(maxsize=32)
+def _var_index_pattern(lower_prefix: str) -> re.Pattern:
+    """Match a lowercased fish variable like 'domain3_...' and capture the index."""
+    return re.compile(rf"^{re.escape(lower_prefix)}(\d+)_")
+
+@lru_cache(maxsize=None)
+def _step_var_pattern(prefix: str) -> re.Pattern:
+    """Match 'step2_' / '@step2=' style variable names; group 1 is the '@'."""
+    return re.compile(rf"(@)?{re.escape(prefix)}([0-9]+)[_=]", re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def _name_occurrence_pattern(lower_prefix: str) -> re.Pattern:
+    """Find every, possibly overlapping, lowercased prefix+digits occurrence."""
+    return re.compile(rf"(?={re.escape(lower_prefix)}([0-9]+))")
+
+# Digit runs that end on a word boundary, as in 'step 12' or '= 3'
+_BOUNDED_DIGITS_RE = re.compile(r"[0-9]+\b")
+
+@lru_cache(maxsize=4096)
+def _resolved_key_pattern(resolved_key: str) -> re.Pattern:
+    """Match 'key = value' or 'key: value' and capture the value."""
+    return re.compile(rf"{re.escape(resolved_key)}\s*[:=]\s*(.+)", re.IGNORECASE)
+
+# The "\s*[:=]\s*(.+)" tail of _resolved_key_pattern, matched after a literal key
+_KEY_VALUE_TAIL_RE = re.compile(r"\s*[:=]\s*(.+)")
+
+def _search_literal_key(line: str, lowered: str, key_lower: str) -> Optional[re.Match]:
+    """
+    _resolved_key_pattern(key).search(line) for ASCII line and key: find the
+    leftmost occurrence of the lowercased key that is followed by the tail.
+    """
+    pos = lowered.find(key_lower)
+    while pos != -1:
+        if match := _KEY_VALUE_TAIL_RE.match(line, pos + len(key_lower)):
+            return match
+        pos = lowered.find(key_lower, pos + 1)
+    return None
+
+_GROUP_1 = operator.itemgetter(1)
+
+@lru_cache(maxsize=None)
+def _object_key_pattern(prefix_pattern: str) -> re.Pattern:
+    """Match an object key: prefix_pattern (a regex) followed by digits."""
+    return re.compile(rf"({prefix_pattern}\d+)")
+
 def find_matching_objects(
     lines: List[str],
     object_prefix: str,
@@ -935,40 +1025,73 @@ def find_matching_objects(
 
     Returns a list of dicts, one per object, mapping internal names to values.
     """
-    objects = defaultdict(dict)
+    objects: Dict[str, Dict] = {}
     # Normalize prefix for special-case handling
     lower_prefix = object_prefix.lower()
 
-    # Step 1: Detect unique suffixes or semantic names for this object type
+    # Step 1: Detect unique suffixes or semantic names for this object type.
+    # The same pass records, per index string, which lines each object's
+    # filter in step 2 would select, so the lines are scanned only once.
     if lower_prefix == 'step':
         # Numeric steps: only match when 'step' precedes digits (e.g., 'step1', '@step2_')
         # Avoid matching bare numbers elsewhere in the file.
-        index_pattern = re.compile(rf"@?{re.escape(object_prefix)}(\d+)\b", re.IGNORECASE)
-        # Collect numeric step indices
-        index_set = {
-            int(m.group(1))
-            for line in lines
-            for m in index_pattern.finditer(line)
-        }
+        index_pattern = _step_pattern(object_prefix)
+        var_pattern = _step_var_pattern(object_prefix)
+        index_set = set()
+        # A step's lines: any '<index>' ending on a word boundary (so 'step1'
+        # or a bare '1'), then fallbacks '@step1_', then 'step1=' and the like
+        suffix_lines = defaultdict(list)
+        at_var_lines = defaultdict(list)
+        var_lines = defaultdict(list)
+        for line_no, line in enumerate(lines):
+            # Collect numeric step indices
+            index_set.update(int(m.group(1)) for m in index_pattern.finditer(line))
+            # Every suffix of a bounded digit run is an index followed by \b
+            suffixes = {
+                digits[i:]
+                for digits in _BOUNDED_DIGITS_RE.findall(line)
+                for i in range(len(digits))
+            }
+            for digits in suffixes:
+                suffix_lines[digits].append(line_no)
+            at_vars = set()
+            plain_vars = set()
+            for at, digits in var_pattern.findall(line):
+                (at_vars if at else plain_vars).add(digits)
+            for digits in at_vars:
+                at_var_lines[digits].append(line_no)
+            for digits in plain_vars | at_vars:
+                var_lines[digits].append(line_no)
     elif lower_prefix == 'stress_detail_name':
         # Semantic stress-detail names from the InsituStressType enum
-        from enums import InsituStressType
         names = [e.value for e in InsituStressType]
+        # Lowercase each line once; shared with the per-name filter below
+        lowered = [line.lower() for line in lines]
         # Match any name if it appears in any line (case-insensitive)
         index_set = {
             name for name in names
-            if any(name.lower() in line.lower() for line in lines)
+            if any(name.lower() in line for line in lowered)
         }
     else:
         # Default: numeric suffix after prefix (e.g., Domain1, Fault2)
         # Use case-insensitive matching to capture fish-set keys like 'domain1_*'
-        index_pattern = re.compile(rf"{re.escape(object_prefix)}(\d+)", re.IGNORECASE)
-        # Collect numeric indices, convert to int for proper ordering
-        index_set = {
-            int(match.group(1))
-            for line in lines
-            if (match := index_pattern.search(line))
-        }
+        index_pattern = _index_pattern(object_prefix)
+        occurrence_pattern = _name_occurrence_pattern(lower_prefix)
+        index_set = set()
+        # An object's lines contain its lowercased name, e.g. 'domain1' (which
+        # 'domain12' also contains): each leading part of the digits counts
+        name_lines = defaultdict(list)
+        for line_no, line in enumerate(lines):
+            # Collect numeric indices, convert to int for proper ordering
+            if match := index_pattern.search(line):
+                index_set.add(int(match.group(1)))
+            names = {
+                digits[:i]
+                for digits in occurrence_pattern.findall(line.lower())
+                for i in range(1, len(digits) + 1)
+            }
+            for digits in names:
+                name_lines[digits].append(line_no)
     logger.info(f"🔬 Found index values for {object_prefix}: {sorted(index_set)}")
 
     # Step 2: Process each object individually
@@ -979,28 +1102,31 @@ def find_matching_objects(
         else:
             obj_name = f"{object_prefix}{index}"
         # Step 2: Filter lines for this object
-        if object_prefix.lower() == 'step':
-            # allow explicit 'step1' or bare numeric suffix '1'
-            suffix_pattern = re.compile(rf"(?:{re.escape(object_prefix)})?{index}\b", re.IGNORECASE)
-            relevant_lines = [line for line in lines if suffix_pattern.search(line)]
-            # Fallback: also match patterns like '@step2_' or 'step2=' in variable names
-            fallback_patterns = [
-                rf"@{re.escape(object_prefix)}{index}[_=]",
-                rf"{re.escape(object_prefix)}{index}[_=]"
-            ]
-            for pat in fallback_patterns:
-                relevant_lines += [line for line in lines if re.search(pat, line, re.IGNORECASE)]
+        if lower_prefix == 'step':
+            # allow explicit 'step1' or bare numeric suffix '1', then the
+            # fallbacks like '@step2_' or 'step2=' in variable names
+            digits = str(index)
+            line_nos = chain(
+                suffix_lines.get(digits, ()),
+                at_var_lines.get(digits, ()),
+                var_lines.get(digits, ()),
+            )
             # Deduplicate while preserving order
             seen = set()
-            deduped = []
-            for line_item in relevant_lines:
+            relevant_lines = []
+            for line_no in line_nos:
+                line_item = lines[line_no]
                 if line_item not in seen:
                     seen.add(line_item)
-                    deduped.append(line_item)
-            relevant_lines = deduped
+                    relevant_lines.append(line_item)
+        elif lower_prefix == 'stress_detail_name':
+            name = obj_name.lower()
+            relevant_lines = [
+                line for line, low in zip(lines, lowered) if name in low
+            ]
         else:
             # require explicit prefix 'Domain1', 'Fault2', etc.
-            relevant_lines = [line for line in lines if obj_name.lower() in line.lower()]
+            relevant_lines = [lines[line_no] for line_no in name_lines.get(str(index), ())]
 
 
         # Step 3: Build patterns from ref_lib keys with placeholders
@@ -1014,7 +1140,7 @@ def find_matching_objects(
                 continue
 
             # Build replacements: index→numeric index, other tokens→object name
-            tokens = re.findall(r"<([^>]+)>", key_template)
+            tokens = _PLACEHOLDER_RE.findall(key_template)
             replacements = {}
             for tok in tokens:
                 if tok.lower() == "index":
@@ -1027,24 +1153,41 @@ def find_matching_objects(
 
             resolved_key = resolve_placeholders(key_template, replacements)
             logger.debug(f"🔧 Resolved key: '{resolved_key}' from template '{key_template}' with {replacements}")
-            # Allow = or : as delimiter
-            pattern = re.compile(rf"{re.escape(resolved_key)}\s*[:=]\s*(.+)", re.IGNORECASE)
-            logger.debug(f"🔧 Pattern for '{resolved_key}': {pattern.pattern}")
-            patterns.append((resolved_key, internal, pattern))
-
-        # Step 4: Match patterns against the filtered lines
+            # Allow = or : as delimiter; ASCII keys are matched as lowercase
+            # literals, others through the case-insensitive regex
+            key_lower = resolved_key.lower() if resolved_key.isascii() else None
+            patterns.append((resolved_key, internal, key_lower))
+
+        # Step 4: Match patterns against the filtered lines; the object's
+        # dict is created on its first match
+        fields = None
         for line_no, line in enumerate(relevant_lines):
-            for resolved_key, internal, pattern in patterns:
-                if match := pattern.search(line):
+            # str.lower agrees with re.IGNORECASE only for ASCII text
+            line_lower = line.lower() if line.isascii() else None
+            for resolved_key, internal, key_lower in patterns:
+                if line_lower is not None and key_lower is not None:
+                    match = _search_literal_key(line, line_lower, key_lower)
+                else:
+                    match = _resolved_key_pattern(resolved_key).search(line)
+                if match:
                     # Extract raw value and strip trailing commas/semicolons
-                    raw_val = match.group(1).strip()
-                    clean_val = re.split(r"[;,]", raw_val, maxsplit=1)[0].strip()
+                    clean_val = match.group(1).strip()
+                    for terminator in _VALUE_TERMINATORS:
+                        cut = clean_val.find(terminator)
+                        if cut != -1:
+                            clean_val = clean_val[:cut]
+                    clean_val = clean_val.strip()
                     # Use internal_name as dictionary key; fallback to resolved_key if missing
                     key = internal or resolved_key
-                    objects[obj_name][key] = clean_val
-                    # Preserve object identifier
-                    objects[obj_name]["name"] = obj_name
+                    if fields is None:
+                        # Object identifier goes right after the first field
+                        fields = objects[obj_name] = {key: clean_val, "name": obj_name}
+                    else:
+                        fields[key] = clean_val
                     logger.debug(f"✅ Line {line_no}: Matched {resolved_key} → {key} = {clean_val}")
+        if fields is not None:
+            # Preserve object identifier, even if a field was named "name"
+            fields["name"] = obj_name
 
     logger.info(f"🔍 Built {len(objects)} '{object_prefix}' objects")
     for name, fields in objects.items():
@@ -1052,19 +1195,23 @@ def find_matching_objects(
 
     return list(objects.values())
 
-def detect_object_keys(lines: list[str], prefix_pattern: str) -> list[str]:
+def detect_object_keys(lines: Iterable[str], prefix_pattern: str) -> list[str]:
     """
     Detect all object keys matching a prefix pattern followed by digits.
     Example: prefix_pattern='Domain' will detect 'Domain1', 'Domain2', etc.
     """
-    import re
     keys = set()
-    pattern = re.compile(rf"({prefix_pattern}\d+)")
+    # Group 1 is the whole key, even if prefix_pattern has groups of its own
+    finditer = _object_key_pattern(prefix_pattern).finditer
     for line in lines:
-        for m in pattern.finditer(line):
-            keys.add(m.group(1))
+        keys.update(map(_GROUP_1, finditer(line)))
     return sorted(keys)
 
+@lru_cache(maxsize=1024)
+def _template_literals(tpl: str) -> Tuple[str, ...]:
+    """Split a template around its <token> placeholders, once per template."""
+    return tuple(_PLACEHOLDER_RE.split(tpl)[::2])
+
 def expand_ref_lib_templates(
     ref_section: dict[str, dict],
     object_keys: list[str]
@@ -1081,48 +1228,38 @@ def expand_ref_lib_templates(
              'template_key': str
          }}
     """
-    import re
     expanded: dict[str, dict] = {}
     for template_key, info in ref_section.items():
         tpl = info.get("outputfile_name")
         if not tpl or "<" not in tpl:
             continue
-        tokens = re.findall(r"<([^>]+)>", tpl)
+        # Every placeholder takes the object key, so join the literal parts
+        literals = _template_literals(tpl)
+        internal = info.get("internal_name")
+        parent = info.get("parent_object")
         for obj_key in object_keys:
-            resolved = tpl
-            for tok in tokens:
-                resolved = resolved.replace(f"<{tok}>", obj_key)
-            expanded[resolved] = {
-                "internal_name": info.get("internal_name"),
+            expanded[obj_key.join(literals)] = {
+                "internal_name": internal,
                 "object_key": obj_key,
-                "parent_object": info.get("parent_object"),
+                "parent_object": parent,
                 "template_key": template_key,
             }
     return expanded
 
-def find_matching_objects_general(
-    lines: list[str],
-    ref_section: dict[str, dict],
-    object_keys: list[str]
-) -> list[dict]:
-    """
-    Generalized matching: expand ref_section templates and scan lines for each resolved key.
-    Returns a list of dicts having 'name': object_key and mapped internal fields.
-    """
-    import re
-    from collections import defaultdict
+def _fish_set_assignments(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Yield the variable name and value after '=' from each fish-set line."""
+    for line in lines:
+        m = _FISH_SET_RE.search(line.strip())
+        if m:
+            yield m.groups()
 
-    # Expand templates
-    expanded = expand_ref_lib_templates(ref_section, object_keys)
+def _objects_from_assignments(
+    assignments: Iterable[Tuple[str, str]],
+    expanded: dict[str, dict]
+) -> list[dict]:
+    """Group fish-set assignments onto objects via expanded template keys."""
     objects: dict[str, dict] = defaultdict(dict)
-
-    # Pattern to extract value after '='
-    pattern = re.compile(r"fish set @([\w\d_]+)\s*=\s*['\"]?(.+?)['\"]?$")
-    for line in lines:
-        m = pattern.search(line.strip())
-        if not m:
-            continue
-        key, raw = m.groups()
+    for key, raw in assignments:
         mapping = expanded.get(key)
         if mapping:
             obj = mapping["object_key"]
@@ -1133,9 +1270,23 @@ def find_matching_objects_general(
             objects[obj]["name"] = obj
 
     return list(objects.values())
+
+def find_matching_objects_general(
+    lines: Iterable[str],
+    ref_section: dict[str, dict],
+    object_keys: list[str]
+) -> list[dict]:
+    """
+    Generalized matching: expand ref_section templates and scan lines for each resolved key.
+    Returns a list of dicts having 'name': object_key and mapped internal fields.
+    Lines are read once, so an open file can be passed directly.
+    """
+    # Expand templates
+    expanded = expand_ref_lib_templates(ref_section, object_keys)
+    return _objects_from_assignments(_fish_set_assignments(lines), expanded)
   
 def find_matching_objects_from_templates(
-    lines: list[str],
+    lines: Iterable[str],
     ref_section: dict[str, dict],
     prefix_pattern: str = "step"
 ) -> list[dict]:
@@ -1144,14 +1295,23 @@ def find_matching_objects_from_templates(
     then expand templated ref_section keys (<index>, <domain_name>, etc.)
     and extract their values from lines.
     Returns list of dicts with 'name': object_key and internal fields.
+    Lines are read once, so an open file can be passed directly.
     """
-    # Auto-detect object keys like 'step1', 'step2', etc.
-    object_keys = detect_object_keys(lines, prefix_pattern)
-    # Delegate to general matcher
-    return find_matching_objects_general(lines, ref_section, object_keys)
+    # Auto-detect object keys like 'step1', 'step2', etc. in the same pass
+    # that keeps the fish-set assignments, rather than reading lines twice
+    keys = set()
+    finditer = _object_key_pattern(prefix_pattern).finditer
+    assignments: list[Tuple[str, str]] = []
+    for line in lines:
+        keys.update(map(_GROUP_1, finditer(line)))
+        m = _FISH_SET_RE.search(line.strip())
+        if m:
+            assignments.append(m.groups())
+    expanded = expand_ref_lib_templates(ref_section, sorted(keys))
+    return _objects_from_assignments(assignments, expanded)
  
 def find_matching_objects_from_dict(
-    lines: List[str],
+    lines: Iterable[str],
     object_prefix: str,
     ref_section: Dict[str, Dict]
 ) -> List[Dict[str, Any]]:
@@ -1159,7 +1319,7 @@ def find_matching_objects_from_dict(
     Parse fish-set lines once into a dict, then build per-object mappings using ref_section templates.
 
     Args:
-        lines: List of lines from an F3DAT file.
+        lines: Lines from an F3DAT file; any iterable, e.g. an open file.
         object_prefix: Prefix for objects (e.g., 'Domain', 'Fault', 'step', etc.).
         ref_section: Reference-library section mapping template keys to metadata
                      (including 'outputfile_name' and 'internal_name').
@@ -1168,13 +1328,12 @@ def find_matching_objects_from_dict(
         A list of dicts, one per object instance, mapping internal field names to extracted values.
     """
     # Build fish_dict: var_name.lower() -> raw string value
-    fish_pattern = re.compile(
-        r"fish\s+set\s+@([\w\d_]+)\s*=\s*['\"]?(.*?)['\"]?\s*$",
-        re.IGNORECASE
-    )
     fish_dict: Dict[str, str] = {}
     for line in lines:
-        m = fish_pattern.search(line.strip())
+        # Cheap pre-check: the pattern needs a literal '@' and '='
+        if "@" not in line or "=" not in line:
+            continue
+        m = _FISH_PATTERN.search(line)
         if not m:
             continue
         var, raw = m.groups()
@@ -1182,32 +1341,39 @@ def find_matching_objects_from_dict(
 
     # Detect object indices from fish_dict keys: e.g., domain3_*
     pref = object_prefix.lower()
-    idx_re = re.compile(rf"^{re.escape(pref)}(\d+)_")
+    idx_re = _var_index_pattern(pref)
     index_set: Set[int] = {
         int(m.group(1))
         for key in fish_dict
         if (m := idx_re.match(key))
     }
+    # Split each ref-lib template once; every object resolves the same set.
+    # ASCII lower-cases per character, so ASCII templates are folded here
+    # rather than on every lookup; anything else is folded after joining.
+    templates: List[Tuple[str, Tuple[str, ...], bool]] = []
+    fold_pieces = pref.isascii()
+    for meta in ref_section.values():
+        tpl = meta.get("outputfile_name") or ""
+        internal = meta.get("internal_name")
+        if not tpl or not internal:
+            continue
+        # Only process templates with placeholders
+        if "<" not in tpl:
+            continue
+        if fold_pieces and tpl.isascii():
+            templates.append((internal, _template_literals(tpl.lower()), False))
+        else:
+            templates.append((internal, _template_literals(tpl), True))
+
     objects: List[Dict[str, Any]] = []
     # For each detected object index
     for idx in sorted(index_set):
         obj_key = f"{pref}{idx}"
         data: Dict[str, Any] = {}
-        # For each ref-lib template entry
-        for meta in ref_section.values():
-            tpl = meta.get("outputfile_name") or ""
-            internal = meta.get("internal_name")
-            if not tpl or not internal:
-                continue
-            # Only process templates with placeholders
-            if "<" not in tpl:
-                continue
-            # Resolve placeholder(s)
-            resolved = tpl
-            for token in re.findall(r"<([^>]+)>", tpl):
-                resolved = resolved.replace(f"<{token}>", obj_key)
-            # Lookup case-insensitive
-            val = fish_dict.get(resolved.lower())
+        for internal, literals, fold in templates:
+            # Resolve placeholder(s), then lookup case-insensitive
+            resolved = obj_key.join(literals)
+            val = fish_dict.get(resolved.lower() if fold else resolved)
             if val is not None:
                 data[internal] = val
         if data:
@@ -1,5 +1,29 @@
+import importlib
 import os
 import sys
 
+import pytest
+
 # Add project src directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+
+@pytest.fixture(scope="module")
+def ui_page():
+    """Return a loader for src.ui page modules, importing each once per module."""
+    pages = {}
+    def load(name):
+        if name not in pages:
+            pages[name] = importlib.import_module(f"src.ui.{name}")
+        return pages[name]
+    return load
+
+
+@pytest.fixture
+def patch_st(monkeypatch):
+    """Install a fresh instance of a Streamlit fake as a page module's `st`."""
+    def install(page, fake_cls):
+        fake = fake_cls()
+        monkeypatch.setattr(page, 'st', fake)
+        return fake
+    return install
@@ -0,0 +1,43 @@
+import json
+import os
+
+from streamlit.testing.v1 import AppTest
+
+# End-to-end runs of the Streamlit entrypoint
+
+APP = os.path.join(os.path.dirname(__file__), "..", "src", "cavroc_pebbl.py")
+
+
+def test_construction_details_reach_generate_json():
+    at = AppTest.from_file(APP, default_timeout=30).run()
+    # Visit Model Construction, then Generate, as a user would from the sidebar
+    at.sidebar.radio[0].set_value("Model Construction").run()
+    at.sidebar.radio[0].set_value("Generate .f3dat").run()
+    assert not at.exception
+
+    preview = json.loads(at.json[0].value)
+    assert [d["name"] for d in preview["model_construction_details"]] == ["stoping"]
+    # The records count as set, so they survive an exclude_unset dump too
+    stopex = at.session_state.stopex
+    assert "model_construction_details" in stopex.model_fields_set
+    unset_dump = json.loads(stopex.model_dump_json(exclude_unset=True))
+    assert unset_dump["model_construction_details"][0]["name"] == "stoping"
+
+
+def test_settings_import_toggles_sit_outside_the_form():
+    at = AppTest.from_file(APP, default_timeout=30).run()
+    at.sidebar.radio[0].set_value("Settings").run()
+    toggles = [c for c in at.checkbox if c.label.startswith("Do you want to import")]
+    assert len(toggles) == 2
+    # Toggles rerun on click, so the inputs they reveal show up at once
+    assert all(c.form_id == "" for c in toggles)
+    # With both toggles off there is nothing to apply, so no form is drawn
+    assert not [b for b in at.button if b.form_id == "advanced_options_form"]
+    for toggle in toggles:
+        toggle.check()
+    at.run()
+    assert not at.exception
+    paths = [t for t in at.text_input if t.label.startswith("Local path")]
+    assert len(paths) == 2
+    assert all(t.form_id == "advanced_options_form" for t in paths)
+    assert [b for b in at.button if b.form_id == "advanced_options_form"]
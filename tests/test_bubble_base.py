@@ -0,0 +1,51 @@
+import pytest
+from pydantic import ValidationError
+
+from bubble_base import enum_lookup, parse_enum
+from enums import (
+    AOIGeoType, DensificationLevel, FLACVersion, InsituStressOption, RelGeoAccuracy,
+)
+from models import InsituStressModel, ModelConstructionDetail, SettingModel
+
+# Tests for the enum helpers in bubble_base
+
+ENUMS = [AOIGeoType, DensificationLevel, FLACVersion, InsituStressOption, RelGeoAccuracy]
+
+VALUES = [
+    # strings: values, names, labels, near misses
+    "maximum", "Maximum", "7_0", "7.0", "v5_0", "Closed Volume", "closed_volume",
+    "no_densification", "MAXIMUM", "unknown", "", " maximum",
+    # ints, bools and floats: positions apply to ints only
+    0, 1, 2, 3, 4, -1, True, False, 1.0, 2.0, 7.0, 2.5,
+    # bad types, including unhashable payload values
+    None, {}, {"a": 1}, [], [1], set(), b"maximum", object(),
+]
+
+
+@pytest.mark.parametrize("enum_class", ENUMS, ids=lambda e: e.__name__)
+@pytest.mark.parametrize("value", VALUES, ids=repr)
+def test_enum_lookup_matches_parse_enum(enum_class, value):
+    assert enum_lookup(enum_class)(value) is parse_enum(enum_class, value)
+
+
+@pytest.mark.parametrize("enum_class", ENUMS, ids=lambda e: e.__name__)
+def test_enum_lookup_resolves_every_member_form(enum_class):
+    parse = enum_lookup(enum_class)
+    for member in enum_class:
+        for form in (member, member.value, member.name, member.label):
+            assert parse(form) is parse_enum(enum_class, form)
+
+
+def test_enum_lookup_float_is_not_a_position():
+    assert enum_lookup(RelGeoAccuracy)(2) is RelGeoAccuracy.Intermediate
+    assert enum_lookup(RelGeoAccuracy)(2.0) is None
+
+
+@pytest.mark.parametrize("bad", [{}, {"a": 1}, [1]], ids=repr)
+def test_enum_validators_reject_unhashable_values(bad):
+    # Unhashable payload values surface as validation errors, not TypeError
+    with pytest.raises(ValidationError):
+        SettingModel(FLAC_version=bad)
+    with pytest.raises(ValidationError):
+        InsituStressModel(stress_option=bad)
+    assert ModelConstructionDetail(geometry_accuracy=bad).geometry_accuracy is None
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+from stl import Mode, mesh
+
+import src.ui.helpers as helpers
+
+# Tests for the STL parsing and preview helpers in ui.helpers
+
+
+def _mesh(n_tri, seed=0):
+    """A numpy-stl mesh of n_tri triangles that share corners on a coarse grid."""
+    rng = np.random.default_rng(seed)
+    m = mesh.Mesh(np.zeros(n_tri, dtype=mesh.Mesh.dtype))
+    m.vectors[:] = rng.integers(0, 8, size=(n_tri, 3, 3)).astype(np.float32) / 4
+    m.attr[:] = 7
+    return m
+
+
+@pytest.mark.parametrize("mode", [Mode.BINARY, Mode.ASCII], ids=["binary", "ascii"])
+@pytest.mark.parametrize("n_tri", [0, 1, 500])
+def test_parse_stl_round_trip(tmp_path, mode, n_tri):
+    path = tmp_path / "part.stl"
+    _mesh(n_tri).save(str(path), mode=mode)
+    data = path.read_bytes()
+
+    vertices, faces = helpers.parse_stl(data, "part.stl")
+    expected = helpers.dedupe_vertices(mesh.Mesh.from_file(str(path)).vectors)
+    np.testing.assert_array_equal(vertices, expected[0])
+    np.testing.assert_array_equal(faces, expected[1])
+    assert vertices.dtype == np.float32 and faces.dtype == np.int32
+    # Faces index back to the original triangle corners
+    np.testing.assert_array_equal(vertices[faces], mesh.Mesh.from_file(str(path)).vectors)
+
+
+def test_parse_stl_accepts_upload_buffer(tmp_path):
+    path = tmp_path / "part.stl"
+    _mesh(20).save(str(path), mode=Mode.BINARY)
+    # Uploads hand over a memoryview, not bytes
+    vertices, faces = helpers.parse_stl(memoryview(path.read_bytes()), "part.stl")
+    assert vertices[faces].shape == (20, 3, 3)
+
+
+def test_binary_stl_with_solid_header_is_read_as_binary(tmp_path):
+    path = tmp_path / "part.stl"
+    m = _mesh(10)
+    m.save(str(path), mode=Mode.BINARY)
+    data = bytearray(path.read_bytes())
+    # Some exporters start binary headers with "solid"; the size decides
+    data[:5] = b"solid"
+    vectors = helpers._read_stl_vectors(bytes(data), "part.stl")
+    np.testing.assert_array_equal(vectors, m.vectors)
+
+
+def test_binary_stl_is_read_without_numpy_stl(tmp_path, monkeypatch):
+    path = tmp_path / "part.stl"
+    m = _mesh(10)
+    m.save(str(path), mode=Mode.BINARY)
+
+    def no_fallback(*args, **kwargs):
+        raise AssertionError("binary STL should be viewed directly")
+
+    monkeypatch.setattr(helpers.mesh.Mesh, "from_file", no_fallback)
+    vectors = helpers._read_stl_vectors(path.read_bytes(), "part.stl")
+    np.testing.assert_array_equal(vectors, m.vectors)
+
+
+class _SessionSt:
+    __slots__ = ("session_state",)
+    def __init__(self):
+        self.session_state = {}
+
+
+def _grid_mesh(n_tri, seed=1):
+    """(vertices, faces) for n_tri random triangles over a shared vertex pool."""
+    rng = np.random.default_rng(seed)
+    n_vert = max(3, n_tri // 2)
+    vertices = np.asfortranarray(rng.random((n_vert, 3)), dtype=np.float32)
+    faces = np.asfortranarray(rng.integers(0, n_vert, size=(n_tri, 3)), dtype=np.int32)
+    return vertices, faces
+
+
+@pytest.mark.parametrize("n_tri,max_tri", [(1000, 100), (1001, 100), (997, 3), (50, 1)])
+def test_decimate_keeps_faces_in_range(n_tri, max_tri):
+    vertices, faces = _grid_mesh(n_tri)
+    kept_vertices, kept_faces = helpers._decimate(vertices, faces, max_tri)
+    assert 0 < len(kept_faces) <= max_tri
+    assert kept_faces.min() >= 0 and kept_faces.max() < len(kept_vertices)
+    # Every kept vertex is used, and each kept triangle is an original one
+    assert len(np.unique(kept_faces)) == len(kept_vertices)
+    step = -(-n_tri // max_tri)
+    np.testing.assert_array_equal(kept_vertices[kept_faces], vertices[faces[::step]])
+    assert kept_vertices.dtype == np.float32 and kept_faces.dtype == np.int32
+
+
+def test_decimate_passes_small_meshes_through():
+    vertices, faces = _grid_mesh(100)
+    kept_vertices, kept_faces = helpers._decimate(vertices, faces, 100)
+    assert kept_vertices is vertices and kept_faces is faces
+
+
+def _trace_arrays(trace):
+    xyz = np.column_stack([np.asarray(trace.x), np.asarray(trace.y), np.asarray(trace.z)])
+    ijk = np.column_stack([np.asarray(trace.i), np.asarray(trace.j), np.asarray(trace.k)])
+    return xyz, ijk
+
+
+@pytest.mark.parametrize("full", [False, True], ids=["preview", "full"])
+def test_mesh_trace_resolution(monkeypatch, full):
+    n_tri = helpers._PREVIEW_MAX_TRIANGLES + 1
+    vertices, faces = _grid_mesh(n_tri)
+    fake = _SessionSt()
+    monkeypatch.setattr(helpers, "st", fake)
+    fake.session_state.update(big_mesh=(vertices, faces), big_file_id=f"big-{n_tri}")
+
+    xyz, ijk = _trace_arrays(helpers.mesh_trace("big", "lightblue", 0.5, full))
+    if full:
+        # Full resolution hands the parsed mesh over unchanged
+        np.testing.assert_array_equal(xyz, vertices)
+        np.testing.assert_array_equal(ijk, faces)
+    else:
+        assert len(ijk) <= helpers._PREVIEW_MAX_TRIANGLES
+        assert ijk.min() >= 0 and ijk.max() < len(xyz)
@@ -1,23 +1,209 @@
+import json
+from types import SimpleNamespace
+
 import pytest
 
 # Tests for UI rendering functions in ui/*
 
-def test_render_project_page(monkeypatch):
-    # Stub Streamlit functions
-    class DummySt:
-        def __init__(self):
-            self.inputs = []
-            self.writes = []
-        def text_input(self, label, value):
-            self.inputs.append((label, value))
-            return "NewProject"
-        def write(self, msg):
-            self.writes.append(msg)
-
-    dummy_st = DummySt()
-    # Monkey-patch st in ui.project
-    import src.ui.project as project_page
-    monkeypatch.setattr(project_page, 'st', dummy_st)
+# Streamlit fakes, one per page, defined once at import; the patch_st fixture
+# installs a fresh instance as the page's `st` for each test. Slots keep the
+# recorded-call attributes off a per-instance __dict__.
+
+class ProjectSt:
+    __slots__ = ("inputs", "writes")
+    def __init__(self):
+        self.inputs = []
+        self.writes = []
+    def text_input(self, label, value):
+        self.inputs.append((label, value))
+        return "NewProject"
+    def write(self, msg):
+        self.writes.append(msg)
+
+
+class SettingsSt:
+    __slots__ = (
+        "selectboxes", "checkboxes", "columns_called", "expanded",
+        "markdowns", "number_inputs", "forms",
+    )
+    def __init__(self):
+        self.selectboxes = []
+        self.checkboxes = []
+        self.columns_called = False
+        self.expanded = False
+        self.markdowns = []
+        self.number_inputs = []
+        self.forms = []
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    def subheader(self, txt):
+        pass
+    def columns(self, n):
+        self.columns_called = True
+        return (self, self)
+    def selectbox(self, label, options, *args, **kwargs):
+        self.selectboxes.append((label, options))
+        return options[0]
+    def checkbox(self, label, value=False, key=None):
+        self.checkboxes.append((label, value, key))
+        return True
+    def expander(self, label):
+        class Exp:
+            def __enter__(inner):
+                return inner
+            def __exit__(inner, exc_type, exc, tb):
+                return False
+        self.expanded = True
+        return Exp()
+    def markdown(self, txt):
+        self.markdowns.append(txt)
+    def number_input(self, label, value=None, step=None):
+        self.number_inputs.append((label, value, step))
+        # return a sample numeric value
+        return value or step or 1
+    def file_uploader(self, *args, **kwargs):
+        return None
+    def text_input(self, label, value):
+        return value
+    def form(self, key):
+        self.forms.append(key)
+        return self
+    def form_submit_button(self, label):
+        return False
+
+
+class PredefinedZoneSt(SettingsSt):
+    # Leaves the custom multiplier off and records the predefined default
+    __slots__ = ("zone_index",)
+    def checkbox(self, label, value=False, key=None):
+        super().checkbox(label, value, key)
+        return key != "custom_zone_toggle"
+    def selectbox(self, label, options, *args, index=0, **kwargs):
+        if label.startswith("Choose predefined"):
+            self.zone_index = index
+        return super().selectbox(label, options, *args, **kwargs)
+
+
+class GenerateSt:
+    __slots__ = (
+        "writes", "json_calls", "json_expanded", "code_calls",
+        "markdowns", "subheaders", "downloads",
+    )
+    def __init__(self):
+        self.writes = []
+        self.json_calls = []
+        self.json_expanded = []
+        self.code_calls = []
+        self.markdowns = []
+        self.subheaders = []
+        self.downloads = []
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    def write(self, msg):
+        self.writes.append(msg)
+    def button(self, label):
+        return True
+    def expander(self, label, expanded=False):
+        return self
+    def code(self, body, language=None):
+        self.code_calls.append(body)
+    def checkbox(self, label, value=False, key=None):
+        return False
+    def json(self, data, expanded=True):
+        self.json_calls.append(data)
+        self.json_expanded.append(expanded)
+    def markdown(self, txt):
+        self.markdowns.append(txt)
+    def subheader(self, txt):
+        self.subheaders.append(txt)
+    def download_button(self, *args, **kwargs):
+        self.downloads.append((args, kwargs))
+
+
+class ModelConstructionSt:
+    __slots__ = (
+        "radio_args", "active", "subheaders", "forms", "dataframes",
+        "session_state",
+    )
+    def __init__(self):
+        self.radio_args = []
+        self.active = None
+        self.subheaders = []
+        self.forms = []
+        self.dataframes = 0
+        self.session_state = {}
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    def form(self, key):
+        self.forms.append(key)
+        return self
+    def form_submit_button(self, label):
+        return False
+    def radio(self, label, options, **kwargs):
+        self.radio_args.append(options)
+        return self.active
+    def subheader(self, txt):
+        self.subheaders.append(txt)
+    def checkbox(self, label, value=False, key=None, **kwargs):
+        return True
+    def dataframe(self, df, use_container_width, hide_index):
+        self.dataframes += 1
+    def warning(self, msg):
+        pass
+    def plotly_chart(self, fig, use_container_width):
+        pass
+    def markdown(self, txt):
+        pass
+
+
+class GeometrySt:
+    __slots__ = ("in_form", "forms", "checkboxes", "charts", "errors", "session_state")
+    def __init__(self):
+        self.in_form = False
+        self.forms = []
+        self.checkboxes = []
+        self.charts = 0
+        self.errors = []
+        self.session_state = {}
+    def form(self, key):
+        fake = self
+        self.forms.append(key)
+        class Form:
+            def __enter__(inner):
+                fake.in_form = True
+            def __exit__(inner, exc_type, exc, tb):
+                fake.in_form = False
+                return False
+        return Form()
+    def form_submit_button(self, label):
+        assert self.in_form
+        return False
+    def file_uploader(self, *args, **kwargs):
+        return None
+    def text_input(self, label, value, key=None):
+        return value
+    def selectbox(self, label, options, index=0, key=None, format_func=None):
+        return options[index]
+    def number_input(self, label, value=None, step=None, key=None):
+        return value
+    def checkbox(self, label, value=False, key=None):
+        self.checkboxes.append((label, self.in_form))
+        return False
+    def plotly_chart(self, fig, use_container_width):
+        self.charts += 1
+    def error(self, msg):
+        self.errors.append(msg)
+
+
+def test_render_project_page(ui_page, patch_st):
+    project_page = ui_page("project")
+    dummy_st = patch_st(project_page, ProjectSt)
 
     # Create a simple stopex with project attribute
     class DummyProject:
@@ -37,54 +223,9 @@ def test_render_project_page(monkeypatch):
     assert dummy_st.writes == ["Optional: Company, User, etc. could go here"]
 
 
-def test_render_settings_page(monkeypatch):
-    # Stub Streamlit functions
-    class DummySt:
-        def __init__(self):
-            self.selectboxes = []
-            self.checkboxes = []
-            self.columns_called = False
-            self.expanded = False
-            self.markdowns = []
-            self.number_inputs = []
-        def __enter__(self):
-            return self
-        def __exit__(self, exc_type, exc, tb):
-            return False
-        def subheader(self, txt):
-            pass
-        def columns(self, n):
-            self.columns_called = True
-            return (self, self)
-        def selectbox(self, label, options, *args, **kwargs):
-            self.selectboxes.append((label, options))
-            return options[0]
-        def checkbox(self, label, value=False, key=None):
-            self.checkboxes.append((label, value, key))
-            return True
-        def expander(self, label):
-            class Exp:
-                def __enter__(inner):
-                    return inner
-                def __exit__(inner, exc_type, exc, tb):
-                    return False
-            self.expanded = True
-            return Exp()
-        def markdown(self, txt):
-            self.markdowns.append(txt)
-        def number_input(self, label, value=None, step=None):
-            self.number_inputs.append((label, value, step))
-            # return a sample numeric value
-            return value or step or 1
-        def file_uploader(self, *args, **kwargs):
-            return None
-        def text_input(self, label, value):
-            return value
-
-    dummy_st = DummySt()
-    # Monkey-patch st in ui.settings
-    import src.ui.settings as settings_page
-    monkeypatch.setattr(settings_page, 'st', dummy_st)
+def test_render_settings_page(ui_page, patch_st):
+    settings_page = ui_page("settings")
+    dummy_st = patch_st(settings_page, SettingsSt)
 
     # Create simple stopex with settings attribute
     class DummySettings:
@@ -116,6 +257,8 @@ def test_render_settings_page(monkeypatch):
     assert dummy_st.selectboxes
     assert dummy_st.checkboxes
     assert dummy_st.number_inputs
+    # Advanced and octree inputs are batched into forms
+    assert dummy_st.forms == ["advanced_options_form", "octree_form"]
     # Check that settings values have been updated to stub returns
     assert stopex.settings.FLAC_version == dummy_st.selectboxes[0][1][0]
     assert stopex.settings.file_format == dummy_st.selectboxes[1][1][0]
@@ -124,83 +267,113 @@ def test_render_settings_page(monkeypatch):
     assert stopex.settings.paraview is True
 
 
-def test_render_generate_page(monkeypatch):
-    # Stub Streamlit functions
-    class DummySt:
-        def __init__(self):
-            self.writes = []
-            self.json_calls = []
-            self.markdowns = []
-            self.subheaders = []
-            self.downloads = []
-        def write(self, msg):
-            self.writes.append(msg)
-        def button(self, label):
-            return True
-        def json(self, data):
-            self.json_calls.append(data)
-        def markdown(self, txt):
-            self.markdowns.append(txt)
-        def subheader(self, txt):
-            self.subheaders.append(txt)
-        def download_button(self, *args, **kwargs):
-            self.downloads.append((args, kwargs))
-
-    dummy_st = DummySt()
-    # Monkey-patch st in ui.generate
-    import src.ui.generate as gen_page
-    monkeypatch.setattr(gen_page, 'st', dummy_st)
+
+@pytest.mark.parametrize(
+    "dropdown,expected",
+    [
+        ("12", 2),
+        ("6", 3),
+        (None, 3),
+        ("0", 3),
+        ("-6", 3),
+        ("nan", 3),
+        ("inf", 3),
+        ("1e-320", 3),
+    ],
+)
+def test_settings_predefined_zone_default(ui_page, patch_st, dropdown, expected):
+    settings_page = ui_page("settings")
+    dummy_st = patch_st(settings_page, PredefinedZoneSt)
+    settings = SimpleNamespace(
+        FLAC_version=None, file_format="", inc_mXrap_result=False,
+        GEM4D_output=False, paraview=False, import_mesh=False,
+        import_mesh_file="", import_map3D=False, import_map3D_file="",
+        target_zones=None, farfieldzonesize=48, model_boundary_offset=None,
+        zone_size_number=None, zonesize_dropdown=dropdown,
+    )
+    # A tiny multiplier makes the ratio overflow to inf; bad values fall back
+    settings_page.render_settings_page(SimpleNamespace(settings=settings))
+    assert dummy_st.zone_index == expected
+    gen_page = ui_page("generate")
+    dummy_st = patch_st(gen_page, GenerateSt)
 
     # Create dummy stopex with model dump methods
     class DummyStopex:
         def __init__(self):
-            self.dumpped = False
+            self.dump_calls = 0
         def model_dump(self, exclude_unset=False):
-            return {'a': 1}
-        def model_dump_json(self, indent=0):
+            raise AssertionError("generate page should not build a dict dump")
+        def model_dump_json(self, indent=0, exclude_unset=False):
+            self.dump_calls += 1
             return '{"a":1}'
 
     stopex = DummyStopex()
     gen_page.render_generate_page(stopex)
     # Check that JSON preview and download button were invoked
-    assert dummy_st.json_calls[-1] == {'a': 1}
-    assert dummy_st.downloads
+    assert dummy_st.json_calls[-1] == '{"a":1}'
+    assert dummy_st.code_calls == ['{"a":1}']
+    assert dummy_st.downloads[0][1]["data"] == '{"a":1}'
+    # Previews and download share a single serialization
+    assert stopex.dump_calls == 1
+    # Live preview opens collapsed to two levels unless fully expanded
+    assert dummy_st.json_expanded[-1] == 2
 
 
-def test_render_model_construction_page(monkeypatch):
-    # Stub Streamlit functions
-    class DummySt:
-        def __init__(self):
-            self.tabs_args = []
-            self.subheaders = []
-        def __enter__(self):
-            return self
-        def __exit__(self, exc_type, exc, tb):
-            return False
-        session_state = {}
-        def tabs(self, titles):
-            self.tabs_args.append(titles)
-            # return one dummy tab for each title
-            return [self] * len(titles)
-        def subheader(self, txt):
-            self.subheaders.append(txt)
-        def checkbox(self, label, value=False, key=None, **kwargs):
-            return True
-        def dataframe(self, df, use_container_width, hide_index):
-            pass
-        def warning(self, msg):
-            pass
-        def plotly_chart(self, fig, use_container_width):
-            pass
-        def markdown(self, txt):
-            pass
-
-    dummy_st = DummySt()
-    import src.ui.model_construction as mc_page
-    monkeypatch.setattr(mc_page, 'st', dummy_st)
-    # Stub geometry handler
-    import src.ui.helpers as helpers
-    monkeypatch.setattr(helpers, 'handle_geometry_section', lambda *args, **kwargs: None)
+def test_geometry_preview_toggle_sits_outside_the_form(ui_page, patch_st):
+    import numpy as np
+    from models import ModelConstructionDetail
+
+    helpers = ui_page("helpers")
+    dummy_st = patch_st(helpers, GeometrySt)
+    vertices = np.asfortranarray([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float32)
+    faces = np.asfortranarray([[0, 1, 2]], dtype=np.int32)
+    dummy_st.session_state.update(
+        geo_mesh=(vertices, faces), geo_file_id="geo-upload-1"
+    )
+    detail = ModelConstructionDetail(name="stoping")
+    detail.file = "part.stl"
+
+    helpers.handle_geometry_section("Stoping", "geo", detail, 48.0, "lightblue")
+    assert dummy_st.forms == ["geo_form"]
+    # The resolution toggle reruns the preview at once, outside the form
+    assert dummy_st.checkboxes == [("Full resolution", False)]
+    assert dummy_st.charts == 1
+    assert not dummy_st.errors
+
+
+def _app_stopex():
+    """A Stopex built the way cavroc_pebbl.py seeds a new session."""
+    from models import (
+        FLACVersion, ModelConstructionModel, ProjectModel, SettingModel, Stopex,
+    )
+    return Stopex(
+        project=ProjectModel(project_name="My Project"),
+        settings=SettingModel(file_format="stl", FLAC_version=FLACVersion.v7_0),
+        model_construction=ModelConstructionModel(),
+        backfills=[], domains=[], faults=[],
+        stress=None, stress_details=[], solving_parameter=None,
+    )
+
+
+def test_generate_download_keeps_default_fields(ui_page, patch_st):
+    gen_page = ui_page("generate")
+    dummy_st = patch_st(gen_page, GenerateSt)
+
+    stopex = _app_stopex()
+    gen_page.render_generate_page(stopex)
+    downloaded = json.loads(dummy_st.downloads[0][1]["data"])
+    # The export is the full model, not just the fields the user has set
+    assert downloaded == json.loads(stopex.model_dump_json(indent=2))
+    assert "target_zones" in downloaded["settings"]
+    assert "farfieldzonesize" in downloaded["settings"]
+    assert "model_construction_details" in downloaded
+
+
+def test_render_model_construction_page(monkeypatch, ui_page, patch_st):
+    mc_page = ui_page("model_construction")
+    dummy_st = patch_st(mc_page, ModelConstructionSt)
+    # Stub geometry handler where the page looks it up
+    monkeypatch.setattr(mc_page, 'handle_geometry_section', lambda *args, **kwargs: None)
 
     # Create dummy stopex with minimal attributes
     class DummyMC:
@@ -220,14 +393,32 @@ def test_render_model_construction_page(monkeypatch):
         def __init__(self):
             self.settings = DummySettings()
             self.model_construction = DummyMC()
+            self.model_construction_details = []
             # paths used in summary
             self.session_state = {}
 
     stopex = DummyStopex()
+    sections = mc_page._SECTIONS
+    # Visit each section in turn, as the radio selector would
+    for section in sections:
+        dummy_st.active = section
+        mc_page.render_model_construction_page(stopex)
+    # Only the selected section's body runs on each rerun
+    assert dummy_st.subheaders == sections
+    assert dummy_st.dataframes == 1
+    # Check that model construction flags and detail records have expected entries
+    from models import ModelConstructionDetail
+    details = stopex.model_construction_details
+    assert all(isinstance(d, ModelConstructionDetail) for d in details)
+    expected = ['stoping', 'topo', 'development', 'area_of_interest', 'historical_mining']
+    assert [d.name for d in details] == expected
+    # Bubble record IDs are not overwritten with section tags
+    assert stopex.model_construction.model_construction_detail == []
+    # Detail records persist in session_state across reruns
+    first = list(details)
     mc_page.render_model_construction_page(stopex)
-    # Check that model construction flags and detail list have expected entries
-    expected = ['stoping', 'topography', 'development', 'area_of_interest', 'historical']
-    assert stopex.model_construction.model_construction_detail == expected
+    assert len(stopex.model_construction_details) == len(first)
+    assert all(a is b for a, b in zip(first, stopex.model_construction_details))
     assert stopex.model_construction.stoping_enabled is True
     assert stopex.model_construction.topo_enabled is True
     assert stopex.model_construction.dev_enabled is True
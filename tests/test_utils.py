@@ -0,0 +1,289 @@
+import asyncio
+import threading
+from enum import IntEnum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+import utils
+from enums import DensificationLevel, DomainType, RelGeoAccuracy
+from models import FaultDirection
+
+# Tests for the helpers in utils
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so a client shared across event loops would reuse a
+    # connection opened on a loop that has since closed
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}' if self.path == "/data" else b"solid mesh\n" * 1000
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def http_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_data_across_event_loops(http_url):
+    # Each asyncio.run starts and closes its own loop
+    assert asyncio.run(utils.fetch_data(f"{http_url}/data")) == {"ok": True}
+    assert asyncio.run(utils.fetch_data(f"{http_url}/data")) == {"ok": True}
+
+
+def test_download_file_across_event_loops(http_url, tmp_path):
+    for _ in range(2):
+        saved = asyncio.run(utils.download_file(f"{http_url}/mesh.stl", tmp_path))
+        assert saved == str(tmp_path / "mesh.stl")
+        assert (tmp_path / "mesh.stl").read_bytes() == b"solid mesh\n" * 1000
+
+
+def test_config_line_key_cache_is_bounded():
+    # Keys carry user-supplied object names; the per-key cache must not grow
+    # with every distinct name in a long-lived process
+    builder = utils.ConfigBuilder()
+    maxsize = utils._key_transforms.cache_info().maxsize
+    assert maxsize is not None
+    for i in range(maxsize + 100):
+        builder.config_line(f"domain_rock_{i}_density", 2700.0)
+    assert utils._key_transforms.cache_info().currsize <= maxsize
+
+
+# Stands in for a missing attribute, so the default applies
+_ABSENT = object()
+
+
+class _Zones(IntEnum):
+    Coarse = 3
+
+
+# (key, value, ref_lib, default) -> mapped_value result, one row per key family
+MAPPED_VALUE_CASES = [
+    pytest.param("include_topography", None, {}, "", "no", id="bool empty None"),
+    pytest.param("is_enabled_flag", "", {}, "", "no", id="bool empty str"),
+    pytest.param("has_faults", True, {}, "", "yes", id="bool true"),
+    pytest.param("custom_zone", False, {}, "", "no", id="bool false"),
+    pytest.param("stoping_enabled", "yes", {}, "", "yes", id="bool str passthrough"),
+    pytest.param("density", True, {}, "", "yes", id="plain True"),
+    pytest.param("Fault1_Rock_or_Soil", DomainType.Soil, {}, "", 1, id="rs DomainType"),
+    pytest.param("Fault1_Rock_or_Soil", 1, {}, "", 1, id="rs int 1"),
+    pytest.param("Domain2_Rock_or_Soil", "2", {}, "", 2, id="rs str 2"),
+    pytest.param("Fault1_Rock_or_Soil", 3, {}, "", 2, id="rs int 3"),
+    pytest.param("Fault1_Rock_or_Soil", " Soil material ", {}, "", 1, id="rs soil text"),
+    pytest.param("Fault1_Rock_or_Soil", "ROCK", {}, "", 2, id="rs rock text"),
+    pytest.param("Fault1_Rock_or_Soil", "clay", {}, "", 2, id="rs other"),
+    pytest.param("Fault1_Rock_or_Soil", None, {}, "", 2, id="rs None"),
+    pytest.param("Fault1_normal_direction", FaultDirection.North, {}, "", 3, id="dir enum"),
+    pytest.param("Fault1_normal_direction", "East", {}, "", "E", id="dir exact"),
+    pytest.param("Fault1_normal_direction", "west", {}, "", "W", id="dir lower"),
+    pytest.param("Fault1_normal_direction", "SOUTH", {}, "", "S", id="dir upper"),
+    pytest.param("Fault1_normal_direction", "sideways", {}, "", "T", id="dir unknown"),
+    pytest.param("Fault1_normal_direction", 7, {}, "", 7, id="dir int passthrough"),
+    pytest.param("Fault1_normal_direction", None, {}, "", None, id="dir None passthrough"),
+    pytest.param("Domain1_anisotropy_surface_normal_direction", "Down", {}, "", "D", id="aniso"),
+    pytest.param("Domain1_densification", DensificationLevel.Maximum, {}, "", 4, id="enum numeric"),
+    pytest.param("Stoping_accuracy", RelGeoAccuracy.Minimum, {}, "", 3, id="enum value"),
+    pytest.param("Fault1_dip_direction", FaultDirection.Top, {}, "", 1, id="enum direction other key"),
+    pytest.param("Domain1_name", "granite", {}, "", "granite", id="plain string"),
+    pytest.param("Domain1_density", 2.5e-5, {}, "", 2.5e-05, id="float"),
+    pytest.param("Domain1_Young", 30.0, {"Domain1_Young": {"internal_name": "young"}}, "", 30.0, id="ref_lib mapping"),
+    pytest.param("Domain1_missing", _ABSENT, {}, "fallback", "fallback", id="missing default"),
+    pytest.param("Domain1_missing", None, {}, "notfound", "notfound", id="notfound default"),
+]
+
+
+@pytest.mark.parametrize("key,value,ref_lib,default,expected", MAPPED_VALUE_CASES)
+def test_mapped_value(key, value, ref_lib, default, expected):
+    field = ref_lib[key]["internal_name"] if key in ref_lib else key
+    obj = SimpleNamespace() if value is _ABSENT else SimpleNamespace(**{field: value})
+    assert utils.mapped_value(obj, key, ref_lib, default) == expected
+
+
+# (key, value, prefix) -> the line ConfigBuilder.config_line writes
+CONFIG_LINE_CASES = [
+    pytest.param("Domain1_cohesion", 1e-5, "", "set @Domain1_cohesion= 0.00001", id="float small"),
+    pytest.param("Domain1_cohesion", -2.5e-7, "", "set @Domain1_cohesion= -0.00000025", id="float small negative"),
+    pytest.param("Domain1_cohesion", 1.23456789e-9, "", "set @Domain1_cohesion= 0.0000000012", id="float tiny"),
+    pytest.param("Domain1_cohesion", 1e-4, "", "set @Domain1_cohesion= 0.0001", id="float threshold"),
+    pytest.param("Domain1_cohesion", 0.0, "", "set @Domain1_cohesion= 0.0", id="float zero"),
+    pytest.param("Domain1_density", 2700.5, "", "set @Domain1_density= 2700.5", id="float regular"),
+    pytest.param("Domain1_modulus", 3.5e20, "", "set @Domain1_modulus= 3.5e+20", id="float large"),
+    pytest.param("Domain1_cohesion", "1e-05", "", "set @Domain1_cohesion= 0.00001", id="sci string"),
+    pytest.param("Domain1_cohesion", "1e-x", "", "set @Domain1_cohesion= 1e-x", id="sci string bad"),
+    pytest.param("Domain1_index", 3, "", "set @Domain1_index= 3", id="int"),
+    pytest.param("Zone_level", _Zones.Coarse, "", "set @Zone_level= 3", id="IntEnum"),
+    pytest.param("include_topography", True, "", "set @include_topography= 'yes'", id="bool true"),
+    pytest.param("include_topography", False, "", "set @include_topography= 'no'", id="bool false"),
+    pytest.param("Domain1_name", None, "", "set @Domain1_name= ''", id="None"),
+    pytest.param("Domain1_name", "notfound", "", "set @Domain1_name= ''", id="notfound"),
+    pytest.param("Domain1_name", "not found", "", "set @Domain1_name= ''", id="not found"),
+    pytest.param("Domain1_name", "granite", "fish ", "fish set @Domain1_name= 'granite'", id="string"),
+    pytest.param("Octree_Mesh", "true", "", "set @Octree_Mesh= 'no'", id="octree true"),
+    pytest.param("Octree_Mesh", "False", "", "set @Octree_Mesh= 'yes'", id="octree False"),
+    pytest.param("Octree_Mesh", "maybe", "", "set @Octree_Mesh= 'maybe'", id="octree other"),
+    pytest.param("Domain1_anisotropy_surface_normal_direction", "North", "", "set @Domain1_anisotropy_surface_normal_direction= 'N'", id="aniso name"),
+    pytest.param("Domain1_anisotropy_surface_normal_direction", "top", "", "set @Domain1_anisotropy_surface_normal_direction= 'T'", id="aniso lower"),
+    pytest.param("Fault1_normal_direction", FaultDirection.West, "", "set @Fault1_normal_direction= 'W'", id="normal enum"),
+    pytest.param("Fault1_Normal_Direction", " 'east' ", "", "set @Fault1_Normal_Direction= 'E'", id="normal text"),
+    pytest.param("Fault1_normal_direction", "zigzag", "", "set @Fault1_normal_direction= 'Z'", id="normal unknown"),
+    pytest.param("Fault1_normal_direction", "", "", "set @Fault1_normal_direction= ''", id="normal empty"),
+]
+
+
+@pytest.mark.parametrize("key,value,prefix,expected", CONFIG_LINE_CASES)
+def test_config_line(key, value, prefix, expected):
+    builder = utils.ConfigBuilder(prefix)
+    builder.config_line(key, value)
+    assert builder.build() == expected
+
+
+def test_mapped_value_key_cache_is_bounded():
+    maxsize = utils._value_handler.cache_info().maxsize
+    assert maxsize is not None
+    obj = SimpleNamespace(density=2700.0)
+    for i in range(maxsize + 100):
+        utils.mapped_value(obj, f"domain_rock_{i}_density", {f"domain_rock_{i}_density": {"internal_name": "density"}})
+    assert utils._value_handler.cache_info().currsize <= maxsize
+
+
+def _objects(lines, prefix, ref_lib):
+    # Field order shows which line each value came from, so compare items
+    return [list(obj.items()) for obj in utils.find_matching_objects(lines, prefix, ref_lib)]
+
+
+STEP_REF_LIB = {
+    "step<index>_time": {"internal_name": "time"},
+    "@step<index>_shape": {"internal_name": "shape"},
+    "step<index>": {"internal_name": "excavation"},
+    "time_<index>": {"internal_name": "duration"},
+}
+
+
+def test_find_matching_objects_step_line_forms():
+    lines = [
+        "; step2 starts here",
+        "set @step2_shape = 'box'",
+        "set step2=stope",
+        "time_2 = 9",
+        "set step1_time = 4 ; step1",
+    ]
+    # Lines ending on the index ('step2=', bare '_2') come first, then '@step2_'
+    assert _objects(lines, "step", STEP_REF_LIB) == [
+        [("time", "4"), ("name", "step1")],
+        [("excavation", "stope"), ("name", "step2"), ("duration", "9"), ("shape", "'box'")],
+    ]
+
+
+def test_find_matching_objects_step_suffix_lines_precede_fallbacks():
+    lines = ["; step2", "set step2_time = 7 ; step 2", "set @step2_time = 5"]
+    # The '@step2_' fallback line is read after the suffix line, so it wins
+    assert _objects(lines, "step", STEP_REF_LIB) == [[("time", "5"), ("name", "step2")]]
+
+
+def test_find_matching_objects_step_fallback_without_suffix_lines():
+    lines = ["; step3", "set @step3_shape = 'cone'", "set step3_time = 12"]
+    assert _objects(lines, "step", STEP_REF_LIB) == [
+        [("shape", "'cone'"), ("name", "step3"), ("time", "12")],
+    ]
+
+
+def test_find_matching_objects_step_lines_are_deduplicated():
+    lines = ["; step2", "set @step2_time = 1", "set step2_time = 3", "set @step2_time = 1"]
+    # The repeated '@step2_' line keeps its first position only
+    assert _objects(lines, "step", STEP_REF_LIB) == [[("time", "3"), ("name", "step2")]]
+
+
+def test_find_matching_objects_domain_prefix_does_not_match_longer_index():
+    lines = [
+        "set domain12_cohesion = 9",
+        "set Domain1_cohesion = 5",
+        "set domain12_friction = 30",
+        "set Domain2_friction = 35",
+    ]
+    ref_lib = {
+        "Domain<index>_cohesion": {"internal_name": "cohesion"},
+        "Domain<index>_friction": {"internal_name": "friction"},
+    }
+    # Objects come out in index order; Domain1 takes nothing from domain12 lines
+    assert _objects(lines, "Domain", ref_lib) == [
+        [("cohesion", "5"), ("name", "Domain1")],
+        [("friction", "35"), ("name", "Domain2")],
+        [("cohesion", "9"), ("name", "Domain12"), ("friction", "30")],
+    ]
+
+
+def test_find_matching_objects_stress_detail_names():
+    lines = [
+        "set stress_minimum_dip = 10",
+        "set Stress_Maximum_dip = 30",
+        "; the maximum azimuth",
+        "set stress_maximum_azimuth = 90",
+    ]
+    ref_lib = {
+        "stress_<name>_dip": {"internal_name": "dip"},
+        "stress_<name>_azimuth": {"internal_name": "azimuth"},
+    }
+    assert _objects(lines, "stress_detail_name", ref_lib) == [
+        [("dip", "30"), ("name", "maximum"), ("azimuth", "90")],
+        [("dip", "10"), ("name", "minimum")],
+    ]
+
+
+COHESION_REF_LIB = {"Domain<index>_cohesion": {"internal_name": "cohesion"}}
+
+
+def test_find_matching_objects_literal_keys_ignore_case():
+    assert _objects(["SET DOMAIN1_COHESION = 5"], "Domain", COHESION_REF_LIB) == [
+        [("cohesion", "5"), ("name", "Domain1")],
+    ]
+
+
+def test_find_matching_objects_literal_key_skips_occurrence_without_value():
+    lines = ["set domain1_cohesionx domain1_cohesion = 7"]
+    assert _objects(lines, "Domain", COHESION_REF_LIB) == [[("cohesion", "7"), ("name", "Domain1")]]
+
+
+@pytest.mark.parametrize(
+    "line,template",
+    [
+        # re.IGNORECASE folds the long s 'ſ' to 's'; str.lower does not
+        pytest.param("set domain1_ſtrength = 4", "Domain<index>_strength", id="non-ASCII line"),
+        pytest.param("set domain1_strength = 4", "Domain<index>_ſtrength", id="non-ASCII key"),
+        pytest.param("set DOMAIN1_STRENGTH_Ä = 4", "Domain<index>_strength_ä", id="non-ASCII both"),
+    ],
+)
+def test_find_matching_objects_non_ascii_uses_regex(line, template):
+    ref_lib = {template: {"internal_name": "strength"}}
+    assert _objects([line], "Domain", ref_lib) == [[("strength", "4"), ("name", "Domain1")]]
+
+
+def test_find_matching_objects_truncates_values():
+    lines = [
+        "set domain1_cohesion = 5e6; comment",
+        "set domain1_friction = 30, 40",
+        "set domain1_name: 'a, b'; c",
+        "set domain1_dip = 45 ;",
+    ]
+    ref_lib = {
+        "Domain<index>_cohesion": {"internal_name": "cohesion"},
+        "Domain<index>_friction": {"internal_name": "friction"},
+        "Domain<index>_name": {"internal_name": "label"},
+        "Domain<index>_dip": {"internal_name": "dip"},
+    }
+    assert _objects(lines, "Domain", ref_lib) == [
+        [("cohesion", "5e6"), ("name", "Domain1"), ("friction", "30"), ("label", "'a"), ("dip", "45")],
+    ]